@@ -0,0 +1,323 @@
+"""
+Scaling benchmarks for dimsumpy.finance.technical.
+
+Every public function is timed at input sizes from 100 to 100k prices and for several n,
+the JSON output has the calls per second of every (function, n, size) and the fitted complexity exponent,
+the slope of log(seconds per call) against log(size), so a linear kernel is about 1.0 and a quadratic one about 2.0.
+The results are compared with a stored baseline to show regressions in the indicator math,
+and every @memoized function is checked that a cache hit is cheaper than computing the result again,
+and that the cache stays within max_bytes when it is called on many different price lists.
+
+python -m benchmarks.technical                                  # full run, compared with benchmarks/technical_baseline.json
+python -m benchmarks.technical --quick --output results.json    # sizes up to 10k
+python -m benchmarks.technical --update-baseline                # store this run as the new baseline
+python -m benchmarks.technical --only sma --update-baseline     # replace the baseline of sma only
+"""
+
+# STANDARD LIBS
+from argparse import ArgumentParser
+from datetime import date
+import json
+from pathlib import Path
+import platform
+import sys
+from time import perf_counter
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+
+# CUSTOM LIBS
+from dimsumpy.finance import technical
+from dimsumpy.finance.cache import cache_info, disable_cache, enable_cache
+from dimsumpy.finance.calendar import TradingCalendar
+
+
+SIZES: List[int] = [100, 316, 1000, 3162, 10000, 31623, 100000]
+QUICK_SIZES: List[int] = [100, 316, 1000, 3162, 10000]
+BASELINE_PATH: Path = Path(__file__).with_name('technical_baseline.json')
+
+
+class Case(NamedTuple):
+    """
+    make(n, data) returns the thunk to time, data is the prepared input of one size.
+    minimum(n) is the shortest input that gives a full result, smaller sizes are skipped.
+    """
+    make: Callable[[Any, Dict[str, Any]], Callable[[], Any]]
+    ns: Tuple[Any, ...]
+    minimum: Callable[[Any], int]
+
+
+def _stream(cls: type, n: int, xs: ndarray) -> Callable[[], Any]:
+    """ one update() per price, in ascending date order """
+    prices = xs[::-1].tolist()
+
+    def run() -> None:
+        streamer = cls(n)
+        for price in prices:
+            streamer.update(price)
+    return run
+
+
+CASES: Dict[str, Case] = {
+    'convert_to_changes': Case(lambda n, d: lambda: technical.convert_to_changes(n, d['list']), (20, 50), lambda n: n + 1),
+    'ema_series': Case(lambda n, d: lambda: technical.ema_series(n, d['array']), (20, 50), lambda n: 3 * n),
+    'ema': Case(lambda n, d: lambda: technical.ema(n, d['list']), (20, 50), lambda n: 3 * n),
+    'emas': Case(lambda n, d: lambda: technical.emas(n, d['list']), (20, 50), lambda n: 3 * n),
+    'quantiles': Case(lambda n, d: lambda: technical.quantiles([0.02, 0.98], d['list']), (None,), lambda n: 2),
+    'quantile': Case(lambda n, d: lambda: technical.quantile(0.98, d['list']), (None,), lambda n: 2),
+    'rolling_quantiles': Case(lambda n, d: lambda: technical.rolling_quantiles([0.02, 0.98], n, d['array']), (50, 500), lambda n: n),
+    'deltas': Case(lambda n, d: lambda: technical.deltas(n, d['list']), (1, 20), lambda n: n + 1),
+    'calculate_rsi': Case(lambda n, d: lambda: technical.calculate_rsi(n, d['list']), (5, 14), lambda n: 14 * n + 1),
+    'rsi_series': Case(lambda n, d: lambda: technical.rsi_series(n, d['array']), (5, 14), lambda n: 14 * n + 1),
+    'rolling_means': Case(lambda n, d: lambda: technical.rolling_means(n, d['array']), (20, 50), lambda n: n),
+    'sma': Case(lambda n, d: lambda: technical.sma(n, d['list']), (20, 50), lambda n: n),
+    'smas': Case(lambda n, d: lambda: technical.smas(n, d['list']), (20, 50), lambda n: n),
+    'steep': Case(lambda n, d: lambda: technical.steep(n, d['list']), (20, 50), lambda n: 3 * n + 5),
+    'steep_series': Case(lambda n, d: lambda: technical.steep_series(n, d['array']), (20, 50), lambda n: 3 * n + 5),
+    'price_matrix': Case(lambda n, d: lambda: technical.price_matrix(d['lists']), (None,), lambda n: 1),
+    'sma_matrix': Case(lambda n, d: lambda: technical.sma_matrix(n, d['matrix']), (20, 50), lambda n: n),
+    'ema_matrix': Case(lambda n, d: lambda: technical.ema_matrix(n, d['matrix']), (20, 50), lambda n: 3 * n),
+    'rsi_matrix': Case(lambda n, d: lambda: technical.rsi_matrix(n, d['matrix']), (5, 14), lambda n: 14 * n + 1),
+    'steep_matrix': Case(lambda n, d: lambda: technical.steep_matrix(n, d['matrix']), (20, 50), lambda n: 3 * n + 5),
+    'changes_matrix': Case(lambda n, d: lambda: technical.changes_matrix(n, d['matrix']), (20, 50), lambda n: n + 1),
+    'StreamingSMA': Case(lambda n, d: _stream(technical.StreamingSMA, n, d['array']), (20, 50), lambda n: n),
+    'StreamingEMA': Case(lambda n, d: _stream(technical.StreamingEMA, n, d['array']), (20, 50), lambda n: 3 * n),
+    'StreamingRSI': Case(lambda n, d: _stream(technical.StreamingRSI, n, d['array']), (5, 14), lambda n: 14 * n + 1),
+    'StreamingSteep': Case(lambda n, d: _stream(technical.StreamingSteep, n, d['array']), (20, 50), lambda n: 3 * n + 5),
+    'forward_max': Case(lambda n, d: lambda: technical.forward_max(n, d['array']), (50, 250), lambda n: n),
+    'forward_min': Case(lambda n, d: lambda: technical.forward_min(n, d['array']), (50, 250), lambda n: n),
+    'backward_max': Case(lambda n, d: lambda: technical.backward_max(n, d['array']), (50, 250), lambda n: n),
+    'backward_min': Case(lambda n, d: lambda: technical.backward_min(n, d['array']), (50, 250), lambda n: n),
+    'rolling_regression': Case(lambda n, d: lambda: technical.rolling_regression(n, d['array']), (20, 250), lambda n: n),
+    'rolling_volatility': Case(lambda n, d: lambda: technical.rolling_volatility(n, d['array']), (20, 250), lambda n: n + 1),
+    'rolling_sharpe': Case(lambda n, d: lambda: technical.rolling_sharpe(n, d['array']), (20, 250), lambda n: n + 1),
+    'rolling_max_drawdown': Case(lambda n, d: lambda: technical.rolling_max_drawdown(n, d['array']), (20, 250), lambda n: n),
+    'check_tops_bottoms': Case(lambda n, d: lambda: technical.check_tops_bottoms(d['array'], n), (50,), lambda n: n),
+    'resample_closes': Case(lambda n, d: lambda: technical.resample_closes(d['array'], d['dates'], n, d['calendar']), ('W', 'M'), lambda n: 1),
+    'period_rsi_series': Case(lambda n, d: lambda: technical.period_rsi_series(n, d['array'], d['dates'], 'W', 1000, d['calendar']), (14,), lambda n: 1000),
+    'IndicatorGraph': Case(lambda n, d: lambda: technical.IndicatorGraph(d['array']).compute(['ma20', 'ma50', 'ma250', 'steep20', 'steep50', 'steep250', 'rsi14']), (None,), lambda n: 1000),
+    'compute_technical_frame': Case(lambda n, d: lambda: technical.compute_technical_frame(d['array'], d['dates'], calendar=d['calendar']), (None,), lambda n: 1000),
+}
+
+
+def make_data(size: int, symbols: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """
+    IMPORTS: numpy, TradingCalendar
+
+    a descending random walk of size prices on size weekdays ending 2024-12-31,
+    as a list, an array and a symbols x size matrix, plus its dates and calendar.
+    """
+    rng = np.random.default_rng(seed)
+    walks = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, (symbols, size)), axis=-1))
+    weeks = size // 5 + 2
+    calendar = TradingCalendar.from_holidays(date.fromordinal(date(2024, 12, 31).toordinal() - 7 * weeks), date(2024, 12, 31))
+    dates = calendar.days[::-1][:size]
+    matrix = walks[:, ::-1].copy()
+    return {'array': matrix[0].copy(), 'list': matrix[0].tolist(), 'matrix': matrix, 'lists': matrix.tolist(),
+            'dates': dates, 'calendar': TradingCalendar(dates)}
+
+
+def time_call(thunk: Callable[[], Any], min_time: float = 0.05, repeats: int = 3) -> float:
+    """
+    the best seconds per call out of repeats rounds, every round loops until it lasts min_time.
+    """
+    thunk()
+    loops = 1
+    while True:
+        start = perf_counter()
+        for _ in range(loops):
+            thunk()
+        elapsed = perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = perf_counter()
+        for _ in range(loops):
+            thunk()
+        best = min(best, (perf_counter() - start) / loops)
+    return best
+
+
+def fit_exponent(sizes: List[int], seconds: List[float]) -> Optional[float]:
+    """
+    IMPORTS: numpy
+
+    the slope of the least-squares line of log(seconds) against log(size), None with fewer than 3 sizes.
+    """
+    if len(sizes) < 3:
+        return None
+    else:
+        return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+def run_benchmarks(sizes: List[int], names: Optional[List[str]] = None, min_time: float = 0.05) -> Dict[str, Any]:
+    """
+    DEPENDS ON: make_data(), time_call(), fit_exponent()
+
+    results[function][n] = {'ops_per_sec': {size: calls per second}, 'exponent': fitted exponent}
+    """
+    datas = {size: make_data(size) for size in sizes}
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, case in CASES.items():
+        if names and name not in names:
+            continue
+        results[name] = {}
+        for n in case.ns:
+            timed_sizes = [size for size in sizes if size >= case.minimum(n)]
+            seconds = [time_call(case.make(n, datas[size]), min_time) for size in timed_sizes]
+            results[name][str(n)] = {
+                'ops_per_sec': {str(size): 1.0 / s for size, s in zip(timed_sizes, seconds)},
+                'exponent': fit_exponent(timed_sizes, seconds),
+            }
+            exponent = results[name][str(n)]['exponent']
+            print(f'{name:<24} n={n!s:<5} exponent={"-" if exponent is None else format(exponent, ".2f"):<6}', file=sys.stderr)
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'sizes': sizes,
+        'results': results,
+    }
+
+
+CACHE_CASES: Dict[str, Callable[[List[float]], Any]] = {
+    'sma(20)': lambda xs: technical.sma(20, xs),
+    'ema(20)': lambda xs: technical.ema(20, xs),
+    'steep(20)': lambda xs: technical.steep(20, xs),
+    'steep(250)': lambda xs: technical.steep(250, xs),
+    'calculate_rsi(14)': lambda xs: technical.calculate_rsi(14, xs),
+    'smas(20)': lambda xs: technical.smas(20, xs),
+    'emas(20)': lambda xs: technical.emas(20, xs),
+    'quantile(0.98)': lambda xs: technical.quantile(0.98, xs),
+}
+
+
+def check_cache(size: int = 2500, min_time: float = 0.05) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    DEPENDS ON: make_data(), time_call()
+    IMPORTS: enable_cache(), disable_cache()
+
+    the seconds per call of every @memoized function with the cache off (a miss) and on (a hit, the same list again),
+    on a list of size prices. A hit that is not cheaper than the computation is a regression.
+    """
+    xs = make_data(size)['list']
+    results: Dict[str, Any] = {}
+    regressions: List[str] = []
+    for name, call in CACHE_CASES.items():
+        disable_cache()
+        miss = time_call(lambda: call(xs), min_time)
+        enable_cache()
+        hit = time_call(lambda: call(xs), min_time)
+        disable_cache()
+        results[name] = {'miss_seconds': miss, 'hit_seconds': hit}
+        print(f'{name:<24} miss={miss * 1e6:.1f}us hit={hit * 1e6:.1f}us', file=sys.stderr)
+        if hit >= miss:
+            regressions.append(f'cache {name} size={size}: a hit takes {hit * 1e6:.1f}us, the computation {miss * 1e6:.1f}us')
+    return results, regressions
+
+
+def check_cache_memory(size: int = 2500, calls: int = 1000, max_bytes: int = 100000) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    DEPENDS ON: make_data()
+    IMPORTS: tracemalloc, enable_cache(), cache_info(), disable_cache()
+
+    every @memoized function is called on calls different lists of size prices with a cache of max_bytes,
+    the cache has to evict and the memory it keeps after the lists are gone, measured by tracemalloc,
+    has to stay within 2 * max_bytes, the keys and the Python objects are only estimated in max_bytes.
+    """
+    base = np.asarray(make_data(size)['list'])
+    enable_cache(max_bytes)
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(calls):
+        xs = (base * (1.0 + i * 1e-9)).tolist()
+        for call in CACHE_CASES.values():
+            call(xs)
+    del xs
+    held = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    info = cache_info()
+    disable_cache()
+    results = {'held_bytes': held, **info}
+    print(f'cache memory held={held} bytes={info["bytes"]} evictions={info["evictions"]}', file=sys.stderr)
+    regressions: List[str] = []
+    if not info['evictions']:
+        regressions.append(f'cache max_bytes={max_bytes}: {calls} different lists of {size} prices evicted nothing')
+    if held > 2 * max_bytes:
+        regressions.append(f'cache max_bytes={max_bytes}: {held} bytes held after {calls} different lists of {size} prices')
+    return results, regressions
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.5, exponent_tolerance: float = 0.25) -> List[str]:
+    """
+    the regressions of report against baseline, a (function, n, size) is slower when its calls per second
+    dropped by more than tolerance, and its scaling is worse when the exponent grew by more than exponent_tolerance.
+    """
+    regressions: List[str] = []
+    for name, by_n in report['results'].items():
+        for n, result in by_n.items():
+            old = baseline.get('results', {}).get(name, {}).get(n)
+            if old is None:
+                continue
+            for size, ops in result['ops_per_sec'].items():
+                old_ops = old['ops_per_sec'].get(size)
+                if old_ops and ops < old_ops * (1.0 - tolerance):
+                    regressions.append(f'{name} n={n} size={size}: {ops:.1f} ops/sec, baseline {old_ops:.1f}')
+            if result['exponent'] is not None and old['exponent'] is not None and result['exponent'] > old['exponent'] + exponent_tolerance:
+                regressions.append(f'{name} n={n}: exponent {result["exponent"]:.2f}, baseline {old["exponent"]:.2f}')
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(description='scaling benchmarks for dimsumpy.finance.technical')
+    parser.add_argument('--quick', action='store_true', help='sizes up to 10k only')
+    parser.add_argument('--only', nargs='*', help='function names to run, all of them by default')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per timing round')
+    parser.add_argument('--output', type=Path, help='write the JSON report to this file')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed drop in ops/sec, 0.5 is 50%%')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.only or []) - set(CASES)
+    if unknown:
+        parser.error(f'unknown functions: {", ".join(sorted(unknown))}')
+    report = run_benchmarks(QUICK_SIZES if args.quick else SIZES, args.only, args.min_time)
+
+    if args.update_baseline:
+        if args.only and args.baseline.exists():  # replace only the functions of this run
+            baseline = json.loads(args.baseline.read_text())
+            baseline['results'].update(report['results'])
+            args.baseline.write_text(json.dumps(baseline, indent=2) + '\n')
+        else:
+            args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'baseline written to {args.baseline}', file=sys.stderr)
+        regressions: List[str] = []
+    elif args.baseline.exists():
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    else:
+        print(f'no baseline at {args.baseline}', file=sys.stderr)
+        regressions = []
+    if not args.only:
+        report['cache'], cache_regressions = check_cache(min_time=args.min_time)
+        report['cache_memory'], memory_regressions = check_cache_memory()
+        regressions.extend(cache_regressions + memory_regressions)
+    report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + '\n')
+    else:
+        print(text)
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
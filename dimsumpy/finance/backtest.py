@@ -0,0 +1,158 @@
+"""
+A vectorized threshold backtester over finance.technical indicators.
+
+Prices and indicators are (symbols x days) matrices, descending in dates and NaN-padded at the oldest end,
+the same layout as price_matrix(). A grid of (n, entry, exit) parameters is evaluated with broadcasting,
+every parameter chunk is one (parameters x symbols x days) array computation, there is no loop over symbols or days.
+
+matrix = price_matrix(price_lists)
+indicators = {n: indicator_matrix(rsi_series, n, matrix) for n in (7, 14, 21)}
+result = sweep_thresholds(matrix, indicators, entries=[20, 25, 30, 35], exits=[50, 60, 70])
+result.summary.sort_values('sharpe')
+"""
+
+# STANDARD LIBS
+from itertools import product
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame
+
+
+TRADING_DAYS: int = 252
+
+
+class SweepResult(NamedTuple):
+    """
+    summary has one row per parameter (n, entry, exit) with the equal-weight portfolio
+    total_return, max_drawdown, sharpe, exposure (the average fraction of symbols held) and trades.
+    total_returns and max_drawdowns are (parameters x symbols) arrays in the row order of summary.
+    """
+    summary: DataFrame
+    total_returns: ndarray
+    max_drawdowns: ndarray
+
+
+def indicator_matrix(series_function: Callable[[int, Any], ndarray], n: int, matrix: Any) -> ndarray:
+    """
+    IMPORTS: numpy
+
+    series_function is a series function of finance.technical, like rsi_series, steep_series, rolling_means or ema_series.
+    result[s, i] is its value for symbol s on date i, NaN where the history is too short, so it lines up with matrix.
+
+    the NaN padding would spread through the running sums of a series, so the symbols are grouped by history length
+    and each group is computed on its valid dates only, one call per distinct length.
+    """
+    xs = np.asarray(matrix, dtype=np.float64)
+    result = np.full(xs.shape, np.nan)
+    lengths = np.count_nonzero(~np.isnan(xs), axis=1)
+    for length in np.unique(lengths):
+        rows = np.flatnonzero(lengths == length)
+        values = series_function(n, xs[rows, :length])
+        result[rows, :values.shape[-1]] = values
+    return result
+
+
+def _max_drawdowns(equity: ndarray) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+
+    equity starts from 1.0 and is ascending in dates along the last axis, the result is the most negative equity / running peak - 1.
+    """
+    peaks = np.maximum.accumulate(equity, axis=-1)
+    np.maximum(peaks, 1.0, out=peaks)
+    np.divide(equity, peaks, out=peaks)
+    return np.minimum(peaks.min(axis=-1, initial=1.0) - 1.0, 0.0)
+
+
+def _positions(indicator: ndarray, entries: ndarray, exits: ndarray, entry_below: bool) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+
+    indicator is (symbols x days) ascending, entries and exits are (parameters,) thresholds.
+    The position is the forward-filled state of the latest signal, 1 after an entry signal until the next exit signal.
+    With entry_below, an entry signal is indicator < entry and an exit signal is indicator > exit (a rebound rule),
+    otherwise an entry is indicator > entry and an exit is indicator < exit (a momentum rule).
+    The result is (parameters x symbols x days) bool.
+
+    each signal is coded as 2 * (day + 1) + (1 for an entry), so one np.maximum.accumulate() finds the latest signal
+    and its lowest bit is the position, no gather is needed. The codes are int16 when the days fit, to halve the memory traffic.
+    """
+    values = indicator[None]
+    if entry_below:
+        entering = values < entries[:, None, None]
+        exiting = values > exits[:, None, None]
+    else:
+        entering = values > entries[:, None, None]
+        exiting = values < exits[:, None, None]
+    code_type = np.int16 if 2 * indicator.shape[-1] + 1 <= np.iinfo(np.int16).max else np.int32
+    codes = np.arange(2, 2 * indicator.shape[-1] + 2, 2, dtype=code_type) + entering
+    codes *= entering | exiting
+    np.maximum.accumulate(codes, axis=-1, out=codes)
+    return (codes & 1).astype(bool)
+
+
+def sweep_thresholds(prices: Any, indicators: Dict[int, Any], entries: Sequence[float], exits: Sequence[float],
+                     entry_below: bool = True, cost: float = 0.0, max_elements: int = 2 ** 20) -> SweepResult:
+    """
+    DEPENDS ON: _positions(), _max_drawdowns()
+    IMPORTS: numpy, pandas, product
+
+    prices is a (symbols x days) matrix and indicators maps each n to its (symbols x days) indicator matrix,
+    all descending in dates, see indicator_matrix(). The grid is every (n, entry, exit) combination.
+
+    A position decided on the close of day t earns the return of day t + 1, so there is no look-ahead.
+    cost is the fraction paid on every entry and every exit.
+    The portfolio puts equal capital in every symbol that has a price that day, idle capital earns nothing.
+    The parameters are processed in chunks of at most max_elements (parameters x symbols x days) items to bound memory.
+    """
+    xs = np.asarray(prices, dtype=np.float64)[:, ::-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.zeros(xs.shape)
+        returns[:, 1:] = xs[:, 1:] / xs[:, :-1] - 1.0
+    listed = ~np.isnan(returns)
+    listed[:, 0] = False
+    returns[~listed] = 0.0
+    listed_counts = np.maximum(listed.sum(axis=0), 1)
+
+    pairs = list(product(entries, exits))
+    chunk = max(1, max_elements // max(xs.size, 1))
+    rows: List[Dict[str, Any]] = []
+    total_returns: List[ndarray] = []
+    max_drawdowns: List[ndarray] = []
+    for n, indicator in indicators.items():
+        values = np.full(xs.shape, np.nan)
+        values[:, 1:] = np.asarray(indicator, dtype=np.float64)[:, :0:-1]  # the signal of the day before
+        for start in range(0, len(pairs), chunk):
+            chunk_pairs = np.array(pairs[start:start + chunk], dtype=np.float64)
+            held = _positions(values, chunk_pairs[:, 0], chunk_pairs[:, 1], entry_below)
+            changes = np.zeros(held.shape, dtype=bool)
+            np.not_equal(held[..., 1:], held[..., :-1], out=changes[..., 1:])
+            daily = held * returns
+            if cost:
+                daily -= cost * changes
+            portfolio = daily.sum(axis=1) / listed_counts
+
+            equity = np.cumprod(daily + 1.0, axis=-1)
+            total_returns.append(equity[..., -1] - 1.0)
+            max_drawdowns.append(_max_drawdowns(equity))
+            portfolio_equity = np.cumprod(portfolio + 1.0, axis=-1)
+            deviations = portfolio.std(axis=-1)
+            sharpes = np.divide(portfolio.mean(axis=-1), deviations, out=np.zeros(len(portfolio)), where=deviations > 0)
+            exposures = (held.sum(axis=1) / listed_counts).mean(axis=-1)
+            trade_counts = (changes & held).sum(axis=(1, 2))
+            for (entry, exit), total, drawdown, sharpe, exposure, trade_count in zip(
+                    chunk_pairs.tolist(), portfolio_equity[:, -1] - 1.0, _max_drawdowns(portfolio_equity),
+                    sharpes * np.sqrt(TRADING_DAYS), exposures, trade_counts):
+                rows.append({'n': n, 'entry': entry, 'exit': exit, 'total_return': total, 'max_drawdown': drawdown,
+                             'sharpe': sharpe, 'exposure': exposure, 'trades': int(trade_count)})
+    empty = np.empty((0, xs.shape[0]))
+    return SweepResult(
+        DataFrame(rows, columns=['n', 'entry', 'exit', 'total_return', 'max_drawdown', 'sharpe', 'exposure', 'trades']),
+        np.concatenate(total_returns) if total_returns else empty,
+        np.concatenate(max_drawdowns) if max_drawdowns else empty,
+    )
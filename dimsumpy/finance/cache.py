@@ -0,0 +1,240 @@
+"""
+An opt-in, content-addressed LRU cache for finance.technical results.
+
+The key of a call is (function name, parameters, the price buffer): a list is keyed by a blake2b hash of its items,
+an ndarray or a PriceSeries by a blake2b hash of its buffer with its dtype and shape,
+so a key is a few hundred bytes whatever the length of the prices, and it is counted in max_bytes with the result.
+A function that only reads a short prefix of the prices, like sma(), ema() and steep(), is keyed by that prefix only.
+The cache is off by default, enable_cache() turns it on for every function decorated with @memoized,
+the signatures of those functions do not change.
+
+enable_cache(max_bytes=64 * 2 ** 20)
+steep(20, prices)       # computed, keyed on prices[:65], the only prices steep(20) reads
+steep(20, prices)       # a dictionary lookup
+cache_info()            # {'hits': 1, 'misses': 1, ...}
+"""
+
+# STANDARD LIBS
+from collections import OrderedDict
+from functools import wraps
+from hashlib import blake2b
+from struct import error as StructError, pack
+import sys
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+
+
+_UNKEYABLE = object()
+_MISSING = object()
+
+
+def _list_digest(items: list) -> bytes:
+    """
+    IMPORTS: struct, blake2b
+    USED BY: _fingerprint(), _prefix_key()
+
+    a 16-byte blake2b digest of the items of a flat list packed as doubles (1 and 1.0 are equal).
+    struct.pack() reads the floats in C without building an ndarray, and the key stays 16 bytes however long the list is,
+    a key of the items themselves would keep a copy of every price list alive outside of max_bytes.
+    """
+    return blake2b(pack(f'{len(items)}d', *items), digest_size=16).digest()
+
+
+def _fingerprint(value: Any) -> Hashable:
+    """
+    DEPENDS ON: _list_digest()
+    IMPORTS: numpy, blake2b
+
+    scalars and strings are their own key, a flat list is keyed by the digest of its items,
+    because converting a list of floats to an array costs more than packing the floats.
+    Other sequences and arrays are keyed by (dtype, shape, blake2b digest of the bytes).
+    _UNKEYABLE means the value cannot be keyed, then the call is not cached.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        try:
+            return ('list', _list_digest(value))
+        except StructError:
+            pass  # a list of lists is keyed as an array
+    try:
+        array = np.ascontiguousarray(value)
+    except (TypeError, ValueError):
+        return _UNKEYABLE
+    if array.dtype == object:
+        return _UNKEYABLE
+    elif array.dtype.kind in 'iub' and not isinstance(value, ndarray):
+        array = array.astype(np.float64)  # [[1, 2]] and [[1.0, 2.0]] give the same result
+    return (array.dtype.str, array.shape, blake2b(array.data, digest_size=16).digest())
+
+
+def _prefix_key(value: Any, length: int) -> Hashable:
+    """
+    DEPENDS ON: _list_digest()
+    IMPORTS: numpy
+
+    the digest of the first length items of a price buffer, for a function that only reads that prefix.
+    A list is sliced as it is, other buffers go through one short float64 slice, so a list, an ndarray
+    and a PriceSeries of the same prices share the key, and the cost does not depend on the length of the buffer.
+    """
+    try:
+        items = value[:length] if isinstance(value, list) else np.asarray(value, dtype=np.float64)[:length].tolist()
+        return ('prefix', _list_digest(items))
+    except (TypeError, ValueError, StructError):
+        return _UNKEYABLE
+
+
+def _result_bytes(result: Any) -> int:
+    """
+    * INDEPENDENT *
+
+    the approximate memory of a result or a key, a list of floats is its pointer array plus 24 bytes per float object.
+    """
+    if isinstance(result, ndarray):
+        return result.nbytes + 112
+    elif isinstance(result, (list, tuple)):
+        return sys.getsizeof(result) + sum(_result_bytes(x) for x in result)
+    else:
+        return sys.getsizeof(result)
+
+
+def _copy_result(result: Any) -> Any:
+    """
+    * INDEPENDENT *
+
+    lists and arrays are copied in and out of the cache, so a caller that changes its result does not change the cache.
+    A list of scalars (the results are homogeneous, the first item tells) is one C-level copy, not a copy per item.
+    """
+    if isinstance(result, ndarray):
+        return result.copy()
+    elif isinstance(result, list):
+        return [_copy_result(x) for x in result] if result and isinstance(result[0], (list, ndarray)) else result.copy()
+    else:
+        return result
+
+
+class LRUCache:
+    """
+    DEPENDS ON: _result_bytes()
+
+    An OrderedDict in least recently used order, bounded by max_bytes of results and their keys.
+    The least recently used entries are evicted until the new entry fits, an entry larger than max_bytes is not stored.
+    """
+    __slots__ = ('max_bytes', 'entries', 'current_bytes', 'hits', 'misses', 'evictions', 'lock')
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self.entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self.current_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[0]
+
+    def put(self, key: Hashable, result: Any) -> None:
+        size = _result_bytes(key) + _result_bytes(result)
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            while self.current_bytes + size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+            self.entries[key] = (result, size)
+            self.current_bytes += size
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def info(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self.entries), 'bytes': self.current_bytes, 'max_bytes': self.max_bytes}
+
+
+_cache: Optional[LRUCache] = None
+
+
+def enable_cache(max_bytes: int = 64 * 2 ** 20) -> None:
+    """
+    turn on the cache for every @memoized function, a new empty cache replaces the old one.
+    """
+    global _cache
+    _cache = LRUCache(max_bytes)
+
+
+def disable_cache() -> None:
+    global _cache
+    _cache = None
+
+
+def clear_cache() -> None:
+    if _cache is not None:
+        _cache.clear()
+
+
+def cache_info() -> Optional[Dict[str, int]]:
+    """
+    the hit, miss and eviction counters and the memory of the cache, None when the cache is off.
+    """
+    return None if _cache is None else _cache.info()
+
+
+def memoized(function: Optional[Callable] = None, *, prefix: Optional[Callable[[Any], int]] = None) -> Any:
+    """
+    DEPENDS ON: _fingerprint(), _prefix_key(), _copy_result(), LRUCache
+    IMPORTS: wraps
+
+    When the cache is off, the call goes straight to function.
+    When it is on, the key is (function name, fingerprints of the arguments),
+    a call with an argument that cannot be keyed is computed without the cache.
+
+    @memoized(prefix=lambda n: 3 * n + 5) is for a function f(n, xs) that only reads xs[:prefix(n)],
+    then only that prefix is keyed, otherwise a hit on a long list costs more than the computation.
+    """
+    if function is None:
+        return lambda f: memoized(f, prefix=prefix)
+    name = f'{function.__module__}.{function.__qualname__}'
+
+    @wraps(function)
+    def _impl(*args, **kwargs):
+        cache = _cache
+        if cache is None:
+            return function(*args, **kwargs)
+        if prefix is not None and len(args) >= 2:
+            arg_keys = (_fingerprint(args[0]), _prefix_key(args[1], prefix(args[0]))) + tuple(_fingerprint(x) for x in args[2:])
+        else:
+            arg_keys = tuple(_fingerprint(x) for x in args)
+        kwarg_keys = tuple((k, _fingerprint(v)) for k, v in sorted(kwargs.items()))
+        if any(f is _UNKEYABLE for f in arg_keys) or any(f is _UNKEYABLE for _, f in kwarg_keys):
+            return function(*args, **kwargs)
+        key = (name, arg_keys, kwarg_keys)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = function(*args, **kwargs)
+            cache.put(key, _copy_result(result))
+            return result
+        else:
+            return _copy_result(result)
+    return _impl
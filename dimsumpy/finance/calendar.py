@@ -0,0 +1,183 @@
+"""
+A trading calendar stored as a sorted int32 array of date.toordinal() day numbers.
+
+add_trading_days() and is_weekly_close() work on one date at a time,
+TradingCalendar does the same lookups for a whole array of dates with np.searchsorted().
+"""
+
+# STANDARD LIBS
+from datetime import date
+from typing import Any, Callable, Iterable, List
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+
+
+EPOCH_ORDINAL: int = date(1970, 1, 1).toordinal()
+
+
+def to_ordinals(dates: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+
+    convert datetime.date objects, numpy datetime64 values, 'YYYY-MM-DD' strings or day numbers to an int32 array of date.toordinal() day numbers.
+    An int32 array of day numbers is returned as it is, not copied.
+    """
+    values = np.asarray(dates)
+    if values.dtype.kind in 'US' or (values.dtype == object and values.size and isinstance(values.flat[0], str)):
+        values = values.astype('datetime64[D]')
+    if np.issubdtype(values.dtype, np.datetime64):
+        return (values.astype('datetime64[D]').astype(np.int64) + EPOCH_ORDINAL).astype(np.int32)
+    elif np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int32, copy=False)  # int32 day numbers stay the same array, PriceSeries views rely on it
+    else:
+        return np.fromiter((d.toordinal() for d in values.ravel()), dtype=np.int32, count=values.size).reshape(values.shape)
+
+
+def to_dates(ordinals: Any) -> List[date]:
+    """
+    * INDEPENDENT *
+    """
+    return [date.fromordinal(int(d)) for d in np.asarray(ordinals).ravel()]
+
+
+def to_datetime64(ordinals: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    """
+    return (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+
+
+def week_numbers(ordinals: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+
+    the number of the Monday to Sunday week of each day, day 1 (0001-01-01) is a Monday.
+    """
+    return (np.asarray(ordinals, dtype=np.int64) - 1) // 7
+
+
+def month_numbers(ordinals: Any) -> ndarray:
+    """
+    DEPENDS ON: to_datetime64()
+    """
+    return to_datetime64(ordinals).astype('datetime64[M]').astype(np.int64)
+
+
+def _period_closes(days: ndarray, period_numbers: Callable[[Any], ndarray]) -> ndarray:
+    """
+    USED BY: TradingCalendar
+
+    True for the last day of each period, the last day of days is a close only if the next weekday is in another period.
+    """
+    periods = period_numbers(days)
+    closes = np.empty(len(days), dtype=bool)
+    closes[:-1] = periods[1:] != periods[:-1]
+    if len(days):
+        next_weekday = to_ordinals(np.busday_offset(to_datetime64(days[-1:]), 1, roll='forward'))
+        closes[-1] = period_numbers(next_weekday)[0] != periods[-1]
+    return closes
+
+
+class TradingCalendar:
+    """
+    DEPENDS ON: to_ordinals(), _period_closes()
+    IMPORTS: numpy
+
+    days is the ascending int32 array of trading days.
+    weekly_closes and monthly_closes mark the last trading day of each week (Monday to Sunday) and each month.
+    The last day of the calendar is a close only if no weekday is left in its week or month.
+
+    calendar = TradingCalendar.from_holidays(date(2015, 1, 1), date(2030, 12, 31), holidays)
+    p20_dates = calendar.shift(dates, -20)
+    """
+    __slots__ = ('days', 'weekly_closes', 'monthly_closes')
+
+    def __init__(self, dates: Iterable[Any]) -> None:
+        self.days: ndarray = np.unique(to_ordinals(dates if isinstance(dates, np.ndarray) else list(dates)))
+        self.weekly_closes: ndarray = _period_closes(self.days, week_numbers)
+        self.monthly_closes: ndarray = _period_closes(self.days, month_numbers)
+
+    @classmethod
+    def from_holidays(cls, FROM: date, TO: date, holidays: Iterable[date] = ()) -> 'TradingCalendar':
+        """
+        IMPORTS: numpy
+
+        all weekdays from FROM to TO, both included, except the holidays.
+        """
+        days = np.arange(np.datetime64(FROM, 'D'), np.datetime64(TO, 'D') + 1)
+        holiday_days = np.array([np.datetime64(d, 'D') for d in holidays], dtype='datetime64[D]')
+        return cls(days[np.is_busday(days, holidays=holiday_days)])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __contains__(self, d: Any) -> bool:
+        return bool(self.positions([d])[0] >= 0)
+
+    def positions(self, dates: Any) -> ndarray:
+        """
+        the position of each date in days, -1 if it is not a trading day.
+        """
+        ordinals = to_ordinals(dates)
+        positions = np.searchsorted(self.days, ordinals)
+        found = positions < len(self.days)
+        found[found] = self.days[positions[found]] == ordinals[found]
+        return np.where(found, positions, -1)
+
+    def shift(self, dates: Any, k: int) -> ndarray:
+        """
+        the vectorized add_trading_days(d, k), as int32 day numbers, -1 where the result is outside the calendar.
+
+        a date that is not a trading day counts from the trading day before it for k >= 0,
+        and from the trading day after it for k < 0, so shift(saturday, 1) is Monday and shift(saturday, -1) is Friday.
+        """
+        ordinals = to_ordinals(dates)
+        side = 'right' if k >= 0 else 'left'
+        bases = np.searchsorted(self.days, ordinals, side=side) - (1 if k >= 0 else 0)
+        positions = bases + k
+        valid = (bases >= 0) & (bases < len(self.days)) & (positions >= 0) & (positions < len(self.days))
+        result = np.full(ordinals.shape, -1, dtype=np.int32)
+        result[valid] = self.days[positions[valid]]
+        return result
+
+    def range_slice(self, FROM: date, TO: date) -> slice:
+        """
+        the positions of the trading days from FROM to TO, both included, so days[range_slice(FROM, TO)] is a view.
+        """
+        start = int(np.searchsorted(self.days, FROM.toordinal(), side='left'))
+        end = int(np.searchsorted(self.days, TO.toordinal(), side='right'))
+        return slice(start, end)
+
+    def is_weekly_close(self, dates: Any) -> ndarray:
+        """
+        the vectorized is_weekly_close(d), False for dates that are not trading days.
+        """
+        return self._lookup(self.weekly_closes, dates)
+
+    def is_monthly_close(self, dates: Any) -> ndarray:
+        """
+        True for the last trading day of each month, False for dates that are not trading days.
+        """
+        return self._lookup(self.monthly_closes, dates)
+
+    def is_period_close(self, dates: Any, period: str) -> ndarray:
+        """
+        period is 'W' for weekly closes or 'M' for monthly closes.
+        """
+        if period == 'W':
+            return self.is_weekly_close(dates)
+        elif period == 'M':
+            return self.is_monthly_close(dates)
+        else:
+            raise ValueError(f"period must be 'W' or 'M', not {period!r}")
+
+    def _lookup(self, mask: ndarray, dates: Any) -> ndarray:
+        positions = self.positions(dates)
+        found = positions >= 0
+        result = np.zeros(positions.shape, dtype=bool)
+        result[found] = mask[positions[found]]
+        return result
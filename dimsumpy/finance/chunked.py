@@ -0,0 +1,347 @@
+"""
+Out-of-core rolling indicators of intraday bars.
+
+1-minute bars are hundreds of millions of rows, more than a Python list (or one float64 array) should hold.
+The kernels here read a price column one chunk at a time, from an .npy file opened with mmap_mode='r',
+any ndarray or np.memmap, or the row groups of a Parquet file (needs pyarrow),
+and carry the state each indicator needs across the chunk boundaries, so the peak memory is one chunk
+plus a window of carried values, however long the column is.
+
+Bars are ascending in time here, the order they are appended to disk, and so is every result:
+result[t] is the indicator of the bar t, NaN until its window is complete, and the result can be another memmap.
+The state carried across a boundary continues the same float operations, so the result does not depend on chunk_size,
+one chunk of the whole column gives exactly the same floats as any split of it.
+
+sma = chunked_means(20, 'spy_1min.npy', path='spy_sma20.npy')
+rsi = chunked_rsi(14, 'spy_1min.parquet', column='close')
+"""
+
+# STANDARD LIBS
+import os
+from typing import Any, Iterator, List, Optional
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+
+try:
+    import pyarrow.parquet as parquet
+except ImportError:  # pyarrow is only needed for Parquet sources
+    parquet = None
+
+# CUSTOM LIBS
+from dimsumpy.finance.technical import _decayed_sums, _rsi_from_averages, _seeded_ema, rolling_quantiles
+
+
+CHUNK_SIZE: int = 2 ** 20
+
+
+def _is_parquet(source: Any) -> bool:
+    """
+    * INDEPENDENT *
+    """
+    return isinstance(source, (str, os.PathLike)) and os.fspath(source).endswith(('.parquet', '.pq'))
+
+
+def _parquet_file(source: Any) -> Any:
+    """
+    USED BY: source_length(), read_chunks()
+    """
+    if parquet is None:
+        raise ImportError('reading Parquet row groups needs pyarrow, pip install pyarrow')
+    return parquet.ParquetFile(source)
+
+
+def _column(source: Any) -> ndarray:
+    """
+    USED BY: source_length(), read_chunks()
+
+    an .npy path is opened as a read-only memmap, an ndarray or np.memmap is used as it is, nothing is read yet.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode='r')
+    else:
+        return np.asanyarray(source)
+
+
+def source_length(source: Any, column: str = 'close') -> int:
+    """
+    DEPENDS ON: _is_parquet(), _parquet_file(), _column()
+
+    the number of bars of source, from the Parquet metadata or the memmap shape, without reading the prices.
+    """
+    if _is_parquet(source):
+        return _parquet_file(source).metadata.num_rows
+    else:
+        return len(_column(source))
+
+
+def read_chunks(source: Any, chunk_size: int = CHUNK_SIZE, column: str = 'close') -> Iterator[ndarray]:
+    """
+    DEPENDS ON: _is_parquet(), _parquet_file(), _column()
+    IMPORTS: numpy, pyarrow (only for Parquet)
+
+    yields float64 arrays of at most chunk_size bars of source, in the order they are stored.
+    A Parquet file is read one batch of its row groups at a time, only the column is decoded.
+    Only the yielded chunk is in memory, a memmap slice is copied into it.
+    """
+    if _is_parquet(source):
+        for batch in _parquet_file(source).iter_batches(batch_size=chunk_size, columns=[column]):
+            yield np.asarray(batch.column(0).to_numpy(zero_copy_only=False), dtype=np.float64)
+    else:
+        values = _column(source)
+        for start in range(0, len(values), chunk_size):
+            yield np.array(values[start:start + chunk_size], dtype=np.float64)
+
+
+class _RunningSums:
+    """
+    IMPORTS: numpy
+    USED BY: ChunkedSMA, ChunkedRSI
+
+    the cumulative sums of a chunked series, sums[k] is the sum of the first k values.
+    The carried sum is put in front of the next chunk for np.cumsum(), so every sum is the same sequential addition
+    that one np.cumsum() of the whole series makes. keep is how many older sums the next chunk can look back.
+    """
+    __slots__ = ('keep', 'tail', 'count')
+
+    def __init__(self, keep: int) -> None:
+        self.keep = keep
+        self.tail = np.zeros(1)
+        self.count = 0
+
+    def update(self, values: ndarray) -> ndarray:
+        """ returns sums[count - len(tail) + 1 : count + len(values) + 1], the carried sums and the sums of the chunk """
+        sums = np.concatenate((self.tail[:-1], np.cumsum(np.concatenate((self.tail[-1:], values)))))
+        self.tail = sums[-(self.keep + 1):]
+        self.count += len(values)
+        return sums
+
+
+class _DecayedWalk:
+    """
+    DEPENDS ON: _decayed_sums()
+    IMPORTS: numpy
+    USED BY: ChunkedEMA, ChunkedRSI
+
+    the _decayed_sums() of a chunked series, the latest m values and the latest decayed sum are carried.
+    The first window is summed directly when m values have been seen, later chunks continue from the carried sum,
+    so every walk is the same float recursion as one _decayed_sums() of the whole series.
+    """
+    __slots__ = ('a', 'm', 'tail', 'walk')
+
+    def __init__(self, a: float, m: int) -> None:
+        self.a = a
+        self.m = m
+        self.tail = np.empty(0)
+        self.walk: Optional[float] = None
+
+    def update(self, us: ndarray) -> ndarray:
+        """ result[k] is the decayed sum of the m values up to us[k], NaN until m values have been seen """
+        result = np.full(len(us), np.nan)
+        values = np.concatenate((self.tail, us))
+        if self.walk is not None:
+            walks = _decayed_sums(self.a, self.m, values, first=self.walk)
+            result[:] = walks[1:]
+            self.walk = float(walks[-1])
+        elif len(values) >= self.m:
+            walks = _decayed_sums(self.a, self.m, values)
+            result[len(us) - len(walks):] = walks
+            self.walk = float(walks[-1])
+        self.tail = values[-self.m:]
+        return result
+
+
+class ChunkedSMA:
+    """
+    DEPENDS ON: _RunningSums
+    IMPORTS: numpy
+
+    update() takes the next chunk of bars and returns the n-bar moving average of every bar of it,
+    NaN for the first n - 1 bars of the series.
+    The sums are taken on (x - first bar), the same as rolling_means(), so they do not grow with the price level,
+    but the cumulative sum runs from the first bar instead of the latest, so the values match rolling_means() to rounding.
+    """
+    __slots__ = ('n', 'base', 'sums')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.base: Optional[float] = None
+        self.sums = _RunningSums(n)
+
+    def update(self, prices: ndarray) -> ndarray:
+        if not len(prices):
+            return np.empty(0)
+        if self.base is None:
+            self.base = float(prices[0])
+        start = self.sums.count
+        sums = self.sums.update(prices - self.base)
+        offset = start + 1 - (len(sums) - len(prices))  # sums[k] is the cumulative sum of the first offset + k bars
+        ends = np.arange(start + 1, start + len(prices) + 1)
+        result = np.full(len(prices), np.nan)
+        valid = ends >= self.n
+        result[valid] = (sums[ends[valid] - offset] - sums[ends[valid] - self.n - offset]) / self.n + self.base
+        return result
+
+
+class ChunkedEMA:
+    """
+    DEPENDS ON: _DecayedWalk, ChunkedSMA, _seeded_ema()
+    IMPORTS: numpy
+
+    update() takes the next chunk of bars and returns ema() of the 3n bars up to every bar of it,
+    NaN for the first 3n - 1 bars of the series.
+    The walk over the latest 2n bars is the float recursion of ema_series(), the seed is the ChunkedSMA of the
+    n bars before them, and the latest 2n SMA values are carried as the seeds of the next chunk.
+    """
+    __slots__ = ('n', 'walk', 'sma', 'seeds')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.walk = _DecayedWalk(1.0 - 2.0 / (n + 1), 2 * n)
+        self.sma = ChunkedSMA(n)
+        self.seeds = np.full(2 * n, np.nan)
+
+    def update(self, prices: ndarray) -> ndarray:
+        walks = self.walk.update(2.0 / (self.n + 1) * prices)
+        seeds = np.concatenate((self.seeds, self.sma.update(prices)))
+        self.seeds = seeds[len(prices):]
+        return _seeded_ema(self.n, walks, seeds[:len(prices)])
+
+
+class ChunkedRSI:
+    """
+    DEPENDS ON: _RunningSums, _DecayedWalk, _rsi_from_averages()
+    IMPORTS: numpy
+
+    update() takes the next chunk of bars and returns calculate_rsi() of all the bars up to every bar of it,
+    NaN for the first 14n bars of the series. The values are bit for bit the values of rsi_series() on the whole series.
+
+    Move k is bar k + 1 - bar k. The Wilder walk of rsi_series() starts from move n and covers the latest 13n moves,
+    the seed is the sum of every older move, a running sum from move 0. The last bar, both walks
+    and the latest 13n running sums of the gains and losses are carried across chunks.
+    """
+    __slots__ = ('n', 'last_price', 'moves', 'gain_walk', 'loss_walk', 'gain_sums', 'loss_sums')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.last_price: Optional[float] = None
+        self.moves = 0
+        self.gain_walk = _DecayedWalk((n - 1) / n, 13 * n)
+        self.loss_walk = _DecayedWalk((n - 1) / n, 13 * n)
+        self.gain_sums = _RunningSums(13 * n)
+        self.loss_sums = _RunningSums(13 * n)
+
+    def _averages(self, moves: ndarray, walk: _DecayedWalk, running_sums: _RunningSums) -> ndarray:
+        n = self.n
+        m = 13 * n
+        skipped = min(max(n - self.moves, 0), len(moves))  # moves before move n are only in the seeds
+        walks = np.full(len(moves), np.nan)
+        walks[skipped:] = walk.update(moves[skipped:] / n)
+        start = running_sums.count
+        sums = running_sums.update(moves)
+        offset = start + 1 - (len(sums) - len(moves))
+        seed_ends = np.arange(start + 1, start + len(moves) + 1) - m
+        seeds = np.full(len(moves), np.nan)
+        valid = seed_ends >= 1
+        seeds[valid] = sums[seed_ends[valid] - offset] / n
+        return walks + ((n - 1) / n) ** m * seeds
+
+    def update(self, prices: ndarray) -> ndarray:
+        result = np.full(len(prices), np.nan)
+        if not len(prices):
+            return result
+        bars = prices if self.last_price is None else np.concatenate(([self.last_price], prices))
+        diffs = bars[1:] - bars[:-1]
+        avg_gains = self._averages(np.maximum(diffs, 0.0), self.gain_walk, self.gain_sums)
+        avg_losses = self._averages(np.maximum(-diffs, 0.0), self.loss_walk, self.loss_sums)
+        self.moves += len(diffs)
+        self.last_price = float(prices[-1])
+        with np.errstate(invalid='ignore'):
+            values = _rsi_from_averages(avg_gains, avg_losses)
+        result[len(prices) - len(diffs):] = np.where(np.isnan(avg_gains) | np.isnan(avg_losses), np.nan, values)
+        return result
+
+
+class ChunkedQuantiles:
+    """
+    DEPENDS ON: rolling_quantiles()
+    IMPORTS: numpy
+
+    update() takes the next chunk of bars and returns the (len(qs) x len(prices)) quantiles of the w bars
+    up to every bar of it, NaN for the first w - 1 bars of the series.
+    The latest w - 1 bars are carried in front of the next chunk, a quantile is one of the window values,
+    so the values are bit for bit the values of rolling_quantiles() on the whole series.
+    """
+    __slots__ = ('qs', 'w', 'tail')
+
+    def __init__(self, qs: List[float], w: int) -> None:
+        self.qs = qs
+        self.w = w
+        self.tail = np.empty(0)
+
+    def update(self, prices: ndarray) -> ndarray:
+        result = np.full((len(self.qs), len(prices)), np.nan)
+        values = np.concatenate((self.tail, prices))
+        if len(values) >= self.w:
+            quantiles = rolling_quantiles(self.qs, self.w, values)
+            result[:, len(prices) - quantiles.shape[-1]:] = quantiles
+        self.tail = values[max(len(values) - self.w + 1, 0):] if self.w > 1 else values[:0]
+        return result
+
+
+def run_chunked(kernel: Any, source: Any, out: Optional[ndarray] = None, path: Optional[str] = None,
+                chunk_size: int = CHUNK_SIZE, column: str = 'close', dtype: Any = np.float64) -> ndarray:
+    """
+    DEPENDS ON: source_length(), read_chunks()
+    IMPORTS: numpy
+
+    feeds every chunk of source to kernel.update() and writes the values to out, or to a new .npy memmap at path,
+    or to a new array. The shape is (bars,), or (len(qs), bars) for ChunkedQuantiles.
+    A kernel keeps its state, so a later call with the new bars of the same series continues the series.
+    """
+    length = source_length(source, column)
+    shape = (len(kernel.qs), length) if isinstance(kernel, ChunkedQuantiles) else (length,)
+    if out is None:
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape) if path else np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f'out has shape {out.shape}, the result needs {shape}')
+    position = 0
+    for chunk in read_chunks(source, chunk_size, column):
+        out[..., position:position + len(chunk)] = kernel.update(chunk)
+        position += len(chunk)
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def chunked_means(n: int, source: Any, out: Optional[ndarray] = None, path: Optional[str] = None,
+                  chunk_size: int = CHUNK_SIZE, column: str = 'close') -> ndarray:
+    """
+    DEPENDS ON: run_chunked(), ChunkedSMA
+    """
+    return run_chunked(ChunkedSMA(n), source, out, path, chunk_size, column)
+
+
+def chunked_ema(n: int, source: Any, out: Optional[ndarray] = None, path: Optional[str] = None,
+                chunk_size: int = CHUNK_SIZE, column: str = 'close') -> ndarray:
+    """
+    DEPENDS ON: run_chunked(), ChunkedEMA
+    """
+    return run_chunked(ChunkedEMA(n), source, out, path, chunk_size, column)
+
+
+def chunked_rsi(n: int, source: Any, out: Optional[ndarray] = None, path: Optional[str] = None,
+                chunk_size: int = CHUNK_SIZE, column: str = 'close') -> ndarray:
+    """
+    DEPENDS ON: run_chunked(), ChunkedRSI
+    """
+    return run_chunked(ChunkedRSI(n), source, out, path, chunk_size, column)
+
+
+def chunked_quantiles(qs: List[float], w: int, source: Any, out: Optional[ndarray] = None, path: Optional[str] = None,
+                      chunk_size: int = CHUNK_SIZE, column: str = 'close') -> ndarray:
+    """
+    DEPENDS ON: run_chunked(), ChunkedQuantiles
+    """
+    return run_chunked(ChunkedQuantiles(qs, w), source, out, path, chunk_size, column)
@@ -0,0 +1,135 @@
+"""
+Rolling correlation, covariance and beta matrices across a stock universe.
+
+returns is a (symbols x days) matrix, descending in dates like price_matrix(), see returns_matrix().
+The pairwise engine works on tiles of symbols: one tile pair keeps a (tile x tile x days) product buffer,
+so the memory stays bounded however many symbols there are. The (days x symbols x symbols) result can be
+an .npy file opened with np.lib.format.open_memmap(), then the full matrix never has to fit in RAM
+and np.load(path, mmap_mode='r')[i] reads the matrix of date i later.
+
+returns = returns_matrix(price_matrix(price_lists))
+correlations = rolling_correlations(returns, 60, path='correlations60.npy')
+betas = rolling_betas(returns, returns[symbols.index('SPY')], 60)
+"""
+
+# STANDARD LIBS
+from typing import Any, Optional, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+
+# CUSTOM LIBS
+from dimsumpy.finance.technical import _window_sums
+
+
+def returns_matrix(prices: Any, log: bool = False) -> ndarray:
+    """
+    IMPORTS: numpy
+
+    result[:, i] is the return from date i + 1 to date i, prices is (symbols x days) and descending in dates,
+    so the result is one day shorter. log returns when log is True, simple returns otherwise.
+    """
+    xs = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = xs[..., :-1] / xs[..., 1:]
+    return np.log(ratios) if log else ratios - 1.0
+
+
+def _moments(returns: ndarray, w: int) -> Tuple[ndarray, ndarray, ndarray]:
+    """
+    DEPENDS ON: _window_sums()
+    USED BY: rolling_comoments(), rolling_betas()
+
+    the zero-filled returns, their window sums and the window sums of squares minus the squared sums / w,
+    with NaN sums for every window that has a missing return.
+    """
+    missing = np.isnan(returns)
+    filled = np.where(missing, 0.0, returns)
+    sums = _window_sums(w, filled)
+    squares = _window_sums(w, filled * filled) - sums * sums / w
+    sums[_window_sums(w, missing.astype(np.float64)) > 0] = np.nan
+    return filled, sums, np.maximum(squares, 0.0)
+
+
+def rolling_comoments(returns: Any, w: int, kind: str = 'correlation', out: Optional[ndarray] = None,
+                      path: Optional[str] = None, tile: int = 32, dtype: Any = np.float32) -> ndarray:
+    """
+    DEPENDS ON: _moments(), _window_sums()
+    IMPORTS: numpy
+
+    result[i, a, b] is the correlation, covariance or beta ('correlation', 'covariance', 'beta') of symbols a and b
+    over the returns of the w days returns[:, i:i+w], the shape is (days - w + 1, symbols, symbols).
+    beta[i, a, b] is the beta of symbol a against symbol b, cov(a, b) / var(b). Windows with a missing return are NaN.
+
+    The result goes to out, or to a new .npy memmap at path, or to a new array.
+    Each pair of symbol tiles is one (tile x tile x days) product buffer, correlation and covariance fill
+    both triangles from one tile, so the cost is about half of the full matrix.
+    """
+    if kind not in ('correlation', 'covariance', 'beta'):
+        raise ValueError(f"kind must be 'correlation', 'covariance' or 'beta', not {kind!r}")
+    xs = np.asarray(returns, dtype=np.float64)
+    symbols, days = xs.shape
+    count = max(days - w + 1, 0)
+    shape = (count, symbols, symbols)
+    if out is None:
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape) if path else np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f'out has shape {out.shape}, the result needs {shape}')
+    if not count:
+        return out
+
+    filled, sums, squares = _moments(xs, w)
+    deviations = np.sqrt(squares)
+    for start_a in range(0, symbols, tile):
+        a = slice(start_a, min(start_a + tile, symbols))
+        for start_b in range(start_a, symbols, tile):
+            b = slice(start_b, min(start_b + tile, symbols))
+            products = _window_sums(w, filled[a, None, :] * filled[None, b, :])
+            covariances = products - sums[a, None, :] * sums[None, b, :] / w
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if kind == 'correlation':
+                    values = covariances / (deviations[a, None, :] * deviations[None, b, :])
+                    values = np.clip(values, -1.0, 1.0)
+                    transposed = values
+                elif kind == 'covariance':
+                    values = covariances / (w - 1)
+                    transposed = values
+                else:
+                    values = covariances / squares[None, b, :]
+                    transposed = covariances / squares[a, None, :]
+            out[:, a, b] = np.moveaxis(values, -1, 0)
+            if start_b != start_a or kind == 'beta':
+                out[:, b, a] = np.moveaxis(transposed, -1, 0).transpose(0, 2, 1)
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def rolling_correlations(returns: Any, w: int, out: Optional[ndarray] = None, path: Optional[str] = None,
+                         tile: int = 32, dtype: Any = np.float32) -> ndarray:
+    """
+    DEPENDS ON: rolling_comoments()
+    """
+    return rolling_comoments(returns, w, 'correlation', out, path, tile, dtype)
+
+
+def rolling_betas(returns: Any, market_returns: Any, w: int) -> ndarray:
+    """
+    DEPENDS ON: _moments(), _window_sums()
+    IMPORTS: numpy
+
+    result[s, i] is the beta of symbol s against the market (e.g. the SPY returns) over returns[s, i:i+w],
+    cov(symbol, market) / var(market), the shape is (symbols, days - w + 1). Windows with a missing return are NaN.
+    One symbol against the market needs no tiles, the whole matrix is one broadcast.
+    """
+    xs = np.asarray(returns, dtype=np.float64)
+    market = np.asarray(market_returns, dtype=np.float64)
+    if xs.shape[-1] < w:
+        return np.empty(xs.shape[:-1] + (0,))
+    else:
+        filled, sums, _ = _moments(xs, w)
+        market_filled, market_sums, market_squares = _moments(market, w)
+        covariances = _window_sums(w, filled * market_filled) - sums * market_sums / w
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return covariances / market_squares
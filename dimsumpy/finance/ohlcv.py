@@ -0,0 +1,183 @@
+"""
+OHLCV indicators of get_price_dataframe() frames (td, open, high, low, close, adjclose, volume).
+
+compute_ohlcv_indicators() takes the frame of one symbol, or a stacked universe frame with a symbol column,
+lays every column out as a (symbols x days) matrix, descending in dates and NaN-padded like price_matrix(),
+and computes ATR, Bollinger bands, MACD, stochastics, OBV and VWAP for all symbols and dates together.
+The indicators share their buffers: one previous-close shift feeds the true range and OBV,
+one cumulative sum of closes feeds the Bollinger middle band and its variance, one close EMA pass per period feeds MACD.
+
+indicators = compute_ohlcv_indicators(price_df)
+price_df = price_df.join(indicators)
+"""
+
+# STANDARD LIBS
+from typing import Dict, List, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+import pandas
+from pandas import DataFrame
+
+# CUSTOM LIBS
+from dimsumpy.finance.calendar import to_ordinals
+from dimsumpy.finance.technical import _window_extremes, _window_sums, ema_series
+
+
+OHLCV_COLUMNS: List[str] = ['atr', 'bb_middle', 'bb_upper', 'bb_lower', 'macd', 'macd_signal', 'macd_histogram',
+                            'stoch_k', 'stoch_d', 'obv', 'vwap']
+
+
+def _stack_frame(df: DataFrame) -> Tuple[ndarray, ndarray, int]:
+    """
+    IMPORTS: numpy, pandas, to_ordinals()
+    USED BY: compute_ohlcv_indicators()
+
+    rows and columns of the (symbols x days) matrices for every row of df,
+    each symbol is one row with its dates descending, a frame without a symbol column is one symbol.
+    """
+    ordinals = to_ordinals(df['td'].to_numpy())
+    codes = pandas.factorize(df['symbol'])[0] if 'symbol' in df.columns else np.zeros(len(df), dtype=np.intp)
+    order = np.lexsort((-ordinals.astype(np.int64), codes))
+    counts = np.bincount(codes, minlength=1)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rows = np.empty(len(df), dtype=np.intp)
+    columns = np.empty(len(df), dtype=np.intp)
+    rows[order] = codes[order]
+    columns[order] = np.arange(len(df)) - np.repeat(starts, counts)
+    return rows, columns, int(counts.max(initial=0))
+
+
+def _missing_windows(w: int, xs: ndarray) -> ndarray:
+    """
+    DEPENDS ON: _window_sums()
+    IMPORTS: numpy
+    USED BY: _masked_window_sums(), _masked_window_extremes(), _windowed_ema()
+
+    result[:, i] is True when xs[:, i:i+w] has a NaN, the length is len(xs) - w + 1.
+    NaN values are counted by a window sum, so one missing price does not spread to later windows.
+    """
+    return _window_sums(w, np.isnan(xs).astype(np.float64)) > 0
+
+
+def _masked_window_sums(w: int, xs: ndarray) -> ndarray:
+    """
+    DEPENDS ON: _window_sums(), _missing_windows()
+    IMPORTS: numpy
+
+    result[:, i] is the sum of xs[:, i:i+w], NaN when the window has a NaN or runs past the oldest date.
+    """
+    length = xs.shape[-1]
+    result = np.full(xs.shape, np.nan)
+    if length >= w:
+        sums = _window_sums(w, np.where(np.isnan(xs), 0.0, xs))
+        result[..., :length - w + 1] = np.where(_missing_windows(w, xs), np.nan, sums)
+    return result
+
+
+def _masked_window_extremes(extreme: np.ufunc, w: int, xs: ndarray) -> ndarray:
+    """
+    DEPENDS ON: _window_extremes(), _missing_windows()
+    IMPORTS: numpy
+
+    result[:, i] is extreme(xs[:, i:i+w]) (np.fmax or np.fmin), NaN when the window has a NaN or runs past the oldest date.
+    The extremes are the O(len) van Herk / Gil-Werman pass of finance.technical, whatever w is.
+    """
+    length = xs.shape[-1]
+    result = np.full(xs.shape, np.nan)
+    if length >= w:
+        result[..., :length - w + 1] = np.where(_missing_windows(w, xs), np.nan, _window_extremes(extreme, w, xs))
+    return result
+
+
+def _windowed_ema(n: int, xs: ndarray) -> ndarray:
+    """
+    DEPENDS ON: ema_series(), _missing_windows()
+    IMPORTS: numpy
+
+    ema_series() of every row, NaN where the 3n window has a NaN or runs past the oldest date.
+    The decayed sums run through the whole row, so NaN is replaced by 0.0 for the pass and masked afterwards.
+    """
+    result = np.full(xs.shape, np.nan)
+    if xs.shape[-1] >= 3 * n:
+        missing = np.isnan(xs)
+        values = ema_series(n, np.where(missing, 0.0, xs))
+        invalid = _missing_windows(3 * n, xs)
+        result[..., :values.shape[-1]] = np.where(invalid, np.nan, values)
+    return result
+
+
+def compute_ohlcv_indicators(df: DataFrame, atr_n: int = 14, bollinger_n: int = 20, bollinger_k: float = 2.0,
+                             macd_ns: Tuple[int, int, int] = (12, 26, 9), stochastic_ns: Tuple[int, int] = (14, 3),
+                             vwap_n: int = 20, adjust: bool = True) -> DataFrame:
+    """
+    DEPENDS ON: _stack_frame(), _masked_window_sums(), _masked_window_extremes(), _windowed_ema()
+    IMPORTS: numpy, pandas
+
+    df has the columns of get_price_dataframe(), in any date order, with an optional symbol column for many symbols.
+    The result has OHLCV_COLUMNS and the index of df, so df.join(result) adds the indicators to every row.
+
+    With adjust, open, high and low are scaled by adjclose / close and adjclose is the close, so splits and dividends
+    do not show up as gaps. The EMAs are ema_series() of finance.technical, each value uses a 3n window.
+
+    atr is the Wilder average of the true range, an EMA with weight 1 / atr_n, that is ema_series(2 * atr_n - 1).
+    bb_middle is the bollinger_n SMA of close, bb_upper and bb_lower add and subtract bollinger_k population standard deviations.
+    macd is EMA(12) - EMA(26) of close, macd_signal is EMA(9) of macd, macd_histogram is their difference.
+    stoch_k is 100 * (close - lowest low) / (highest high - lowest low) over 14 days, stoch_d is its 3-day SMA.
+    obv is the running sum of volume signed by the close move, from the first date of each symbol.
+    vwap is the volume-weighted typical price (high + low + close) / 3 over vwap_n days.
+    """
+    rows, columns, width = _stack_frame(df)
+    height = int(rows.max(initial=-1)) + 1
+
+    def matrix(column: str) -> ndarray:
+        result = np.full((height, width), np.nan)
+        result[rows, columns] = df[column].to_numpy(dtype=np.float64)
+        return result
+
+    high, low, close, volume = matrix('high'), matrix('low'), matrix('close'), matrix('volume')
+    if adjust:
+        adjclose = matrix('adjclose')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = np.where(close != 0, adjclose / close, 1.0)
+        high, low, close = high * factor, low * factor, adjclose
+
+    previous_close = np.full(close.shape, np.nan)
+    previous_close[:, :-1] = close[:, 1:]
+    moves = close - previous_close
+    outputs: Dict[str, ndarray] = {}
+
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    outputs['atr'] = _windowed_ema(2 * atr_n - 1, true_range)
+
+    base = np.nan_to_num(close[:, :1])
+    deviations = close - base
+    mean_deviations = _masked_window_sums(bollinger_n, deviations) / bollinger_n
+    variances = np.maximum(_masked_window_sums(bollinger_n, deviations * deviations) / bollinger_n - mean_deviations ** 2, 0.0)
+    outputs['bb_middle'] = mean_deviations + base
+    outputs['bb_upper'] = outputs['bb_middle'] + bollinger_k * np.sqrt(variances)
+    outputs['bb_lower'] = outputs['bb_middle'] - bollinger_k * np.sqrt(variances)
+
+    fast_n, slow_n, signal_n = macd_ns
+    outputs['macd'] = _windowed_ema(fast_n, close) - _windowed_ema(slow_n, close)
+    outputs['macd_signal'] = _windowed_ema(signal_n, outputs['macd'])
+    outputs['macd_histogram'] = outputs['macd'] - outputs['macd_signal']
+
+    k_n, d_n = stochastic_ns
+    highest = _masked_window_extremes(np.fmax, k_n, high)
+    lowest = _masked_window_extremes(np.fmin, k_n, low)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        outputs['stoch_k'] = np.where(highest > lowest, 100.0 * (close - lowest) / (highest - lowest), np.nan)
+    outputs['stoch_d'] = _masked_window_sums(d_n, outputs['stoch_k']) / d_n
+
+    signed_volumes = np.where(np.isnan(moves), 0.0, np.sign(moves)) * np.where(np.isnan(volume), 0.0, volume)
+    obv = np.cumsum(signed_volumes[:, ::-1], axis=-1)[:, ::-1]
+    outputs['obv'] = np.where(np.isnan(close), np.nan, obv)
+
+    typical = (high + low + close) / 3.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_sums = _masked_window_sums(vwap_n, volume)
+        outputs['vwap'] = np.where(volume_sums > 0, _masked_window_sums(vwap_n, typical * volume) / volume_sums, np.nan)
+
+    return DataFrame({column: outputs[column][rows, columns] for column in OHLCV_COLUMNS}, index=df.index)
@@ -0,0 +1,339 @@
+"""
+Option chain aggregation.
+
+calculate_premiums() in pizzapy converts every expiry page on its own and filters it eight times,
+here all expiry pages are concatenated into one typed chain frame, and the call / put premiums,
+ITM / OTM premiums and open interests of all expiries come from one np.bincount() reduction.
+
+pages = [(call_df, put_df) for each expiry]      # the 11-column tables of an options page
+chain = make_chain_frame(pages)
+call_money, put_money, call_oi, put_oi, call_otm, call_itm, put_otm, put_itm = aggregate_premiums(chain, price)
+
+The Black-Scholes prices, greeks and implied volatilities below broadcast over whole chains,
+the implied volatility solver iterates all contracts together, there is no loop over contracts.
+
+chain = add_greeks(chain, price, years_to_expiry(chain['expiry']), rate=0.04)
+"""
+
+# STANDARD LIBS
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+import pandas
+from pandas import DataFrame
+
+
+OPTION_COLUMNS: List[str] = ['Contract', 'LTD', 'Strike', 'Last', 'Bid', 'Ask', 'IsOTM', 'PercentChg', 'Volume', 'OI', 'Vol']
+
+CHAIN_COLUMNS: List[str] = ['expiry', 'is_put', 'contract', 'strike', 'last', 'bid', 'ask', 'volume', 'oi']
+
+PREMIUM_FIELDS: List[str] = ['call_money', 'put_money', 'call_oi', 'put_oi', 'call_otm', 'call_itm', 'put_otm', 'put_itm']
+
+
+def _to_floats(values: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy, pandas
+
+    the vectorized float0(), numbers are kept, strings like '1,234' are parsed, '-' and other text become 0.0.
+    """
+    series = pandas.Series(values)
+    if series.dtype == object or pandas.api.types.is_string_dtype(series.dtype):
+        series = series.astype(str).str.replace(',', '', regex=False)
+    return pandas.to_numeric(series, errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def make_chain_frame(pages: Sequence[Tuple[DataFrame, DataFrame]], expiries: Optional[Sequence[Any]] = None) -> DataFrame:
+    """
+    DEPENDS ON: _to_floats()
+    IMPORTS: numpy, pandas
+    USED BY: total_premiums()
+
+    pages are the (call_df, put_df) tables of each expiry page, expiries are their labels (the page positions by default).
+    A page is skipped unless both tables have the 11 columns of OPTION_COLUMNS, the same rule as calculate_page_premiums().
+
+    The result has CHAIN_COLUMNS, one row per contract of every page,
+    all raw tables are concatenated first so every column is converted once, not once per page.
+    """
+    labels = list(range(len(pages))) if expiries is None else list(expiries)
+    tables: List[DataFrame] = []
+    table_labels: List[Any] = []
+    table_puts: List[bool] = []
+    for label, (call_df, put_df) in zip(labels, pages):
+        if len(call_df.columns) == 11 and len(put_df.columns) == 11:
+            for is_put, df in ((False, call_df), (True, put_df)):
+                tables.append(df.set_axis(OPTION_COLUMNS, axis=1))
+                table_labels.append(label)
+                table_puts.append(is_put)
+    if not tables:
+        return DataFrame({column: pandas.Series(dtype=dtype) for column, dtype in zip(CHAIN_COLUMNS, [object, bool, object] + [np.float64] * 6)})
+    else:
+        raw = pandas.concat(tables, ignore_index=True)
+        lengths = [len(table) for table in tables]
+        return DataFrame({
+            'expiry': np.repeat(np.array(table_labels), lengths),
+            'is_put': np.repeat(np.array(table_puts, dtype=bool), lengths),
+            'contract': raw['Contract'].astype(str).to_numpy(),
+            'strike': _to_floats(raw['Strike']),
+            'last': _to_floats(raw['Last']),
+            'bid': _to_floats(raw['Bid']),
+            'ask': _to_floats(raw['Ask']),
+            'volume': _to_floats(raw['Volume']),
+            'oi': _to_floats(raw['OI']),
+        })
+
+
+def _premium_groups(chain: DataFrame, price: Optional[float]) -> Tuple[ndarray, ndarray, ndarray]:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+
+    the group of each contract, 0 call ITM, 1 call OTM, 2 put ITM, 3 put OTM, with its premium (last * oi * 100) and oi.
+    A call is OTM when strike > price, a put when strike < price, every contract is ITM when price is None or 0.
+    """
+    is_put = chain['is_put'].to_numpy(dtype=bool)
+    strike = chain['strike'].to_numpy(dtype=np.float64)
+    oi = chain['oi'].to_numpy(dtype=np.float64)
+    premium = chain['last'].to_numpy(dtype=np.float64) * oi * 100.0
+    is_otm = np.where(is_put, strike < price, strike > price) if price else np.zeros(len(chain), dtype=bool)
+    return 2 * is_put.astype(np.intp) + is_otm, premium, oi
+
+
+def aggregate_premiums(chain: DataFrame, price: Optional[float]) -> Tuple[float, float, float, float, float, float, float, float]:
+    """
+    DEPENDS ON: _premium_groups()
+    IMPORTS: numpy
+    USED BY: total_premiums()
+
+    the 8 totals of get_total_premiums() in the same order (PREMIUM_FIELDS),
+    call_money, put_money, call_oi, put_oi, call_otm, call_itm, put_otm, put_itm, from two np.bincount() calls.
+    """
+    groups, premium, oi = _premium_groups(chain, price)
+    call_itm, call_otm, put_itm, put_otm = np.bincount(groups, weights=premium, minlength=4).astype(np.float64).tolist()
+    call_oi, put_oi = np.bincount(groups // 2, weights=oi, minlength=2).astype(np.float64).tolist()
+    return call_itm + call_otm, put_itm + put_otm, call_oi, put_oi, call_otm, call_itm, put_otm, put_itm
+
+
+def premiums_by_expiry(chain: DataFrame, price: Optional[float]) -> DataFrame:
+    """
+    DEPENDS ON: _premium_groups()
+    IMPORTS: numpy, pandas
+
+    the PREMIUM_FIELDS totals of each expiry, indexed by expiry, from one groupby().sum().
+    """
+    groups, premium, oi = _premium_groups(chain, price)
+    is_put = groups >= 2
+    is_otm = (groups % 2).astype(bool)
+    parts = DataFrame({
+        'expiry': chain['expiry'].to_numpy(),
+        'call_money': np.where(is_put, 0.0, premium),
+        'put_money': np.where(is_put, premium, 0.0),
+        'call_oi': np.where(is_put, 0.0, oi),
+        'put_oi': np.where(is_put, oi, 0.0),
+        'call_otm': np.where(~is_put & is_otm, premium, 0.0),
+        'call_itm': np.where(~is_put & ~is_otm, premium, 0.0),
+        'put_otm': np.where(is_put & is_otm, premium, 0.0),
+        'put_itm': np.where(is_put & ~is_otm, premium, 0.0),
+    })
+    return parts.groupby('expiry', sort=False)[PREMIUM_FIELDS].sum()
+
+
+def total_premiums(pages: Sequence[Tuple[DataFrame, DataFrame]], price: Optional[float]) -> Tuple[float, float, float, float, float, float, float, float]:
+    """
+    DEPENDS ON: make_chain_frame(), aggregate_premiums()
+
+    the vectorized replacement of calculate_page_premiums() on every page followed by the 8 sums of get_total_premiums().
+    """
+    return aggregate_premiums(make_chain_frame(pages), price)
+
+
+SECONDS_PER_YEAR: float = 365.0 * 86400.0
+
+
+def normal_cdf(x: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+
+    the standard normal CDF without scipy, Hart's double precision rational approximation as given by West (2005),
+    the absolute error is below 1e-14 everywhere.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    exponential = np.exp(-0.5 * z * z)
+    numerator = (((((0.0352624965998911 * z + 0.700383064443688) * z + 6.37396220353165) * z + 33.912866078383) * z
+                  + 112.079291497871) * z + 221.213596169931) * z + 220.206867912376
+    denominator = ((((((0.0883883476483184 * z + 1.75566716318264) * z + 16.064177579207) * z + 86.7807322029461) * z
+                     + 296.564248779674) * z + 637.333633378831) * z + 793.826512519948) * z + 440.413735824752
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = z + 1.0 / (z + 2.0 / (z + 3.0 / (z + 4.0 / (z + 0.65))))
+        tail = np.where(z < 7.07106781186547, exponential * numerator / denominator, exponential / fraction / 2.506628274631)
+    tail = np.where(z > 37.0, 0.0, tail)
+    return np.where(x > 0.0, 1.0 - tail, tail)
+
+
+def normal_pdf(x: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+    """
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _d1_d2(spot: Any, strike: Any, years: Any, rate: Any, sigma: Any, dividend: Any) -> Tuple[ndarray, ndarray]:
+    """
+    * INDEPENDENT *
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = sigma * np.sqrt(years)
+        d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * sigma * sigma) * years) / root
+    return d1, d1 - root
+
+
+def black_scholes_price(spot: Any, strike: Any, years: Any, rate: Any, sigma: Any, is_put: Any, dividend: Any = 0.0) -> ndarray:
+    """
+    DEPENDS ON: _d1_d2(), normal_cdf()
+    IMPORTS: numpy
+
+    European option prices, every argument broadcasts, so one call prices a whole chain.
+    """
+    d1, d2 = _d1_d2(spot, strike, years, rate, sigma, dividend)
+    forward_spot = spot * np.exp(-dividend * years)
+    discounted_strike = strike * np.exp(-rate * years)
+    call = forward_spot * normal_cdf(d1) - discounted_strike * normal_cdf(d2)
+    put = discounted_strike * normal_cdf(-d2) - forward_spot * normal_cdf(-d1)
+    return np.where(is_put, put, call)
+
+
+def black_scholes_greeks(spot: Any, strike: Any, years: Any, rate: Any, sigma: Any, is_put: Any, dividend: Any = 0.0) -> Dict[str, ndarray]:
+    """
+    DEPENDS ON: _d1_d2(), normal_cdf(), normal_pdf()
+    IMPORTS: numpy
+
+    delta, gamma, vega (per 1.00 of volatility), theta (per year) and rho (per 1.00 of rate), broadcast like black_scholes_price().
+    """
+    d1, d2 = _d1_d2(spot, strike, years, rate, sigma, dividend)
+    dividend_discount = np.exp(-dividend * years)
+    discounted_strike = strike * np.exp(-rate * years)
+    density = normal_pdf(d1)
+    sqrt_years = np.sqrt(years)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = dividend_discount * density / (spot * sigma * sqrt_years)
+        decay = -spot * dividend_discount * density * sigma / (2.0 * sqrt_years)
+    call_delta = dividend_discount * normal_cdf(d1)
+    put_delta = call_delta - dividend_discount
+    call_theta = decay - rate * discounted_strike * normal_cdf(d2) + dividend * spot * dividend_discount * normal_cdf(d1)
+    put_theta = decay + rate * discounted_strike * normal_cdf(-d2) - dividend * spot * dividend_discount * normal_cdf(-d1)
+    return {
+        'delta': np.where(is_put, put_delta, call_delta),
+        'gamma': gamma,
+        'vega': spot * dividend_discount * density * sqrt_years,
+        'theta': np.where(is_put, put_theta, call_theta),
+        'rho': np.where(is_put, -years * discounted_strike * normal_cdf(-d2), years * discounted_strike * normal_cdf(d2)),
+    }
+
+
+def implied_volatility(option_price: Any, spot: Any, strike: Any, years: Any, rate: Any, is_put: Any, dividend: Any = 0.0,
+                       low: float = 1e-4, high: float = 5.0, tolerance: float = 1e-8, max_iterations: int = 100) -> ndarray:
+    """
+    DEPENDS ON: black_scholes_price(), black_scholes_greeks()
+    IMPORTS: numpy
+
+    the implied volatility of every contract, solved for all contracts at once.
+    Every contract keeps a bracket [low, high] that always holds the root. It takes a Newton step from its current sigma,
+    and when that step leaves the bracket or vega is too small, it bisects instead, so it converges like Newton near the root
+    and never diverges. The loop is over iterations, each iteration is array work on the contracts not yet converged.
+
+    NaN where the price is outside the no-arbitrage range of [low, high] volatility, or years <= 0.
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (option_price, spot, strike, years, rate, dividend)),
+                                 np.asarray(is_put, dtype=bool))
+    target, spot, strike, years, rate, dividend, is_put = (a.ravel() for a in arrays)
+    shape = arrays[0].shape
+    size = target.size
+
+    def price(i: ndarray, sigma: ndarray) -> ndarray:
+        return black_scholes_price(spot[i], strike[i], years[i], rate[i], sigma, is_put[i], dividend[i])
+
+    everything = np.arange(size)
+    lows = np.full(size, low)
+    highs = np.full(size, high)
+    with np.errstate(invalid='ignore'):
+        valid = (years > 0) & (spot > 0) & (strike > 0) & (target > 0)
+        valid[valid] &= (price(everything[valid], lows[valid]) <= target[valid]) & (target[valid] <= price(everything[valid], highs[valid]))
+    result = np.full(size, np.nan)
+    sigma = np.full(size, 0.3)
+
+    active = everything[valid]
+    for _ in range(max_iterations):
+        if not len(active):
+            break
+        s = sigma[active]
+        error = price(active, s) - target[active]
+        vega = black_scholes_greeks(spot[active], strike[active], years[active], rate[active], s, is_put[active], dividend[active])['vega']
+        done = np.abs(error) <= tolerance * np.maximum(target[active], 1.0)
+        result[active[done]] = s[done]
+        too_high = error > 0
+        highs[active] = np.where(too_high, s, highs[active])
+        lows[active] = np.where(too_high, lows[active], s)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = s - error / vega
+        inside = (vega > 1e-12) & (newton > lows[active]) & (newton < highs[active])
+        sigma[active] = np.where(inside, newton, 0.5 * (lows[active] + highs[active]))
+        narrow = highs[active] - lows[active] <= tolerance
+        result[active[narrow & ~done]] = sigma[active[narrow & ~done]]
+        active = active[~done & ~narrow]
+    return result.reshape(shape)
+
+
+def years_to_expiry(expiries: Any, as_of: Optional[float] = None) -> ndarray:
+    """
+    IMPORTS: numpy, time
+
+    expiries are the unix timestamps of the expiry pages (the date= parameter of the options urls),
+    as_of is a unix timestamp, now by default.
+    """
+    now = time.time() if as_of is None else as_of
+    return (np.asarray(expiries, dtype=np.float64) - now) / SECONDS_PER_YEAR
+
+
+def add_greeks(chain: DataFrame, price: float, years: Any, rate: float = 0.0, dividend: float = 0.0, use_mid: bool = False) -> DataFrame:
+    """
+    DEPENDS ON: implied_volatility(), black_scholes_greeks()
+    IMPORTS: numpy
+
+    chain is a make_chain_frame() frame, years is the time to expiry of each row (or one number for all rows).
+    The result is a copy of chain with iv, delta, gamma, vega, theta and delta_exposure (delta * oi * 100 * price) columns.
+    The option price is last, or the bid / ask midpoint where use_mid is True and both quotes are positive.
+    """
+    last = chain['last'].to_numpy(dtype=np.float64)
+    if use_mid:
+        bid = chain['bid'].to_numpy(dtype=np.float64)
+        ask = chain['ask'].to_numpy(dtype=np.float64)
+        last = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), last)
+    strike = chain['strike'].to_numpy(dtype=np.float64)
+    is_put = chain['is_put'].to_numpy(dtype=bool)
+    years = np.broadcast_to(np.asarray(years, dtype=np.float64), last.shape)
+    iv = implied_volatility(last, price, strike, years, rate, is_put, dividend)
+    greeks = black_scholes_greeks(price, strike, years, rate, iv, is_put, dividend)
+    result = chain.copy()
+    result['iv'] = iv
+    for name in ('delta', 'gamma', 'vega', 'theta'):
+        result[name] = greeks[name]
+    result['delta_exposure'] = greeks['delta'] * chain['oi'].to_numpy(dtype=np.float64) * 100.0 * price
+    return result
+
+
+def chain_greeks(pages: Sequence[Tuple[DataFrame, DataFrame]], expiries: Sequence[Any], price: float, rate: float = 0.0,
+                 dividend: float = 0.0, as_of: Optional[float] = None) -> DataFrame:
+    """
+    DEPENDS ON: make_chain_frame(), years_to_expiry(), add_greeks()
+
+    pages are the 11-column (call_df, put_df) tables that calculate_premiums() consumes, expiries their unix timestamps.
+    """
+    chain = make_chain_frame(pages, expiries)
+    return add_greeks(chain, price, years_to_expiry(chain['expiry'].to_numpy(), as_of), rate, dividend)
@@ -0,0 +1,119 @@
+"""
+PriceSeries keeps the closing prices of one symbol in two contiguous arrays,
+int32 day numbers (date.toordinal()) and float64 closes, about 12 bytes per trading day.
+
+An OrderedDict[date, float] from get_price_odict() costs about 200 bytes per trading day,
+and every date filter is a full scan with Python date comparisons.
+PriceSeries slices dates with np.searchsorted() in O(log n) and returns views, nothing is copied.
+
+np.asarray(series) is the closes array, so a PriceSeries can be passed to every finance.technical function.
+Those functions need descending dates, that is series.descending().
+"""
+
+# STANDARD LIBS
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Iterator, List, Optional, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame
+
+# CUSTOM LIBS
+from dimsumpy.finance.calendar import to_dates, to_ordinals
+
+
+class PriceSeries:
+    """
+    DEPENDS ON: to_ordinals()
+    IMPORTS: numpy
+
+    days and closes have the same length, both ascending or both descending in dates.
+    Integer indexing returns a float, slicing returns a PriceSeries view by position.
+    """
+    __slots__ = ('days', 'closes', 'is_descending')
+
+    def __init__(self, days: Any, closes: Any, is_descending: Optional[bool] = None) -> None:
+        self.days: ndarray = to_ordinals(days)
+        self.closes: ndarray = np.asarray(closes, dtype=np.float64)
+        if self.days.shape != self.closes.shape or self.days.ndim != 1:
+            raise ValueError(f'days {self.days.shape} and closes {self.closes.shape} must be 1-D arrays of the same length')
+        self.is_descending: bool = bool(self.days[0] > self.days[-1]) if is_descending is None and len(self.days) > 1 else bool(is_descending)
+
+    @classmethod
+    def from_odict(cls, odict: 'OrderedDict[date, float]') -> 'PriceSeries':
+        """ keeps the order of odict, get_price_odict(ascending=False) gives a descending series """
+        days = np.fromiter((d.toordinal() for d in odict.keys()), dtype=np.int32, count=len(odict))
+        closes = np.fromiter(odict.values(), dtype=np.float64, count=len(odict))
+        return cls(days, closes)
+
+    @classmethod
+    def from_dataframe(cls, df: DataFrame, column: str = 'adjclose', date_column: str = 'td') -> 'PriceSeries':
+        """ keeps the order of df, the output of get_price_dataframe() has 'td' and 'adjclose' columns """
+        return cls(df[date_column].to_numpy(), df[column].to_numpy(dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    def __array__(self, dtype: Any = None, copy: Optional[bool] = None) -> ndarray:
+        closes = self.closes if dtype is None else self.closes.astype(dtype, copy=False)
+        return closes.copy() if copy else closes
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, slice):
+            return PriceSeries(self.days[key], self.closes[key], self.is_descending if (key.step or 1) > 0 else not self.is_descending)
+        else:
+            return float(self.closes[key])
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.closes.tolist())
+
+    def __reversed__(self) -> Iterator[float]:
+        return iter(self.closes[::-1].tolist())
+
+    def __repr__(self) -> str:
+        order = 'descending' if self.is_descending else 'ascending'
+        span = f'{to_dates(self.days[:1])[0]} .. {to_dates(self.days[-1:])[0]}' if len(self) else 'empty'
+        return f'PriceSeries({len(self)} days, {order}, {span})'
+
+    def ascending(self) -> 'PriceSeries':
+        """ a view with ascending dates, no copy """
+        return self[::-1] if self.is_descending else self
+
+    def descending(self) -> 'PriceSeries':
+        """ a view with descending dates (latest price first), no copy """
+        return self if self.is_descending else self[::-1]
+
+    def _bounds(self, start_day: float, end_day: float) -> Tuple[int, int]:
+        """ the positions of the days from start_day to end_day, both included """
+        ascending_days = self.days[::-1] if self.is_descending else self.days
+        start = int(np.searchsorted(ascending_days, start_day, side='left'))
+        end = int(np.searchsorted(ascending_days, end_day, side='right'))
+        length = len(self.days)
+        return (length - end, length - start) if self.is_descending else (start, end)
+
+    def between(self, FROM: Optional[date] = None, TO: Optional[date] = None) -> 'PriceSeries':
+        """ a view of the days from FROM to TO, both included, in the same order """
+        start, end = self._bounds(-np.inf if FROM is None else FROM.toordinal(), np.inf if TO is None else TO.toordinal())
+        return self[start:end]
+
+    def until(self, td: date) -> 'PriceSeries':
+        """ the td_prices of the price pipeline, every day on or before td """
+        return self.between(None, td)
+
+    def get(self, d: date, default: Optional[float] = None) -> Optional[float]:
+        """ the O(log n) odict.get(d) """
+        start, end = self._bounds(d.toordinal(), d.toordinal())
+        return float(self.closes[start]) if end > start else default
+
+    def __contains__(self, d: date) -> bool:
+        start, end = self._bounds(d.toordinal(), d.toordinal())
+        return end > start
+
+    @property
+    def dates(self) -> List[date]:
+        return to_dates(self.days)
+
+    def to_odict(self) -> 'OrderedDict[date, float]':
+        return OrderedDict(zip(self.dates, self.closes.tolist()))
@@ -0,0 +1,125 @@
+"""
+Block-bootstrap Monte Carlo of price targets for a stock universe.
+
+calculate_changes() of pizzapy takes one 0.98 / 0.02 quantile of the historical 20-day and 50-day changes.
+bootstrap_targets() simulates thousands of price paths per symbol instead, each path glues together blocks of
+consecutive daily log returns of the symbol's own recent history, and returns the quantile bands of every day
+of the horizon. A block keeps the short-term autocorrelation of the returns inside it,
+block = 20 makes every 20-day path one historical 20-day change, the same sample calculate_changes() uses.
+
+prices is a (symbols x days) matrix, descending in dates and NaN-padded at the oldest end, like price_matrix().
+All symbols of a chunk draw and gather their paths together, the chunks only bound the memory.
+
+result = bootstrap_targets(price_matrix(price_lists), paths=10000, seed=20260101)
+result.summary[['target20_0.02', 'target20_0.98', 'target50_0.02', 'target50_0.98']]
+"""
+
+# STANDARD LIBS
+from typing import Any, List, NamedTuple, Sequence, Tuple
+
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame
+
+
+class SimulationResult(NamedTuple):
+    """
+    changes[s, d, j] is the qs[j] quantile of the change of symbol s from its latest price after d + 1 days,
+    targets is the latest price * (1 + changes), both are (symbols x days x len(qs)) and NaN for a short history.
+    summary has one row per symbol with the columns change{h}_{q} and target{h}_{q} of every horizon h and quantile q.
+    """
+    summary: DataFrame
+    changes: ndarray
+    targets: ndarray
+
+
+def _return_history(xs: ndarray, window: int) -> Tuple[ndarray, ndarray]:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    USED BY: bootstrap_targets()
+
+    the daily log returns of the latest window + 1 prices of every symbol, ascending in dates and left-aligned,
+    so result[s, :counts[s]] are the returns of symbol s from the oldest to the latest, the rest is 0.0.
+    """
+    recent = xs[:, :window + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(recent[:, :-1] / recent[:, 1:])
+    counts = np.count_nonzero(~np.isnan(returns), axis=1)
+    result = np.zeros(returns.shape)
+    rows, columns = np.nonzero(np.arange(returns.shape[1]) < counts[:, None])
+    result[rows, columns] = returns[rows, counts[rows] - 1 - columns]
+    return result, counts
+
+
+def _simulate_log_changes(returns: ndarray, counts: ndarray, horizon: int, paths: int, block: int,
+                          generators: List[np.random.Generator]) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    USED BY: bootstrap_targets()
+
+    the (symbols x horizon x paths) log changes from the latest price along every bootstrapped path,
+    every count needs to be at least block.
+    Each symbol draws its block starts from its own generator, so a symbol gets the same paths in any chunk.
+    A block starts anywhere in the history where block returns fit, the blocks of a path are concatenated
+    and cut at horizon, so the whole chunk is one gather and one cumulative sum.
+    The paths are the last axis, so the paths of each day are sorted in contiguous memory.
+    """
+    symbols, width = returns.shape
+    blocks = -(-horizon // block)
+    starts = np.stack([generator.integers(0, count - block + 1, size=(blocks, paths))
+                       for generator, count in zip(generators, counts.tolist())])
+    offsets = (starts[:, :, None, :] + np.arange(block)[:, None]).reshape(symbols, blocks * block, paths)[:, :horizon]
+    offsets += (np.arange(symbols) * width)[:, None, None]
+    return np.cumsum(returns.ravel()[offsets], axis=1)
+
+
+def bootstrap_targets(prices: Any, horizons: Sequence[int] = (20, 50), qs: Sequence[float] = (0.02, 0.1, 0.5, 0.9, 0.98),
+                      paths: int = 10000, block: int = 5, window: int = 500, seed: Any = None,
+                      max_elements: int = 2 ** 24) -> SimulationResult:
+    """
+    DEPENDS ON: _return_history(), _simulate_log_changes()
+    IMPORTS: numpy, pandas
+
+    prices is a (symbols x days) matrix, descending in dates and NaN-padded, see price_matrix().
+    Every symbol gets paths bootstrapped paths of max(horizons) days from the daily log returns of its latest window days,
+    window = 500 is the 501-price window of the target prices. A symbol with fewer than block returns is NaN.
+
+    seed is anything np.random.default_rng() takes. It is spread into one independent stream per symbol,
+    so the same seed, prices and parameters give the same result whatever max_elements is.
+    The quantile q is the (q * (paths + 1) - 1)th smallest path, the index convention of quantile(),
+    and like quantile() it is 0.0 when q is outside [0, 1] or its index is outside (0, paths).
+    One sort of the log changes of every day picks all the quantiles, expm1() keeps their order,
+    so only the picked quantiles are converted to changes.
+    The symbols are processed in chunks of at most max_elements (symbols x paths x days) path values to bound memory.
+    """
+    xs = np.asarray(prices, dtype=np.float64)
+    symbols = xs.shape[0]
+    horizon = max(horizons)
+    quantile_levels = np.asarray(qs, dtype=np.float64)
+    indices = np.array([int(q * (paths + 1) - 1.0) if 0.0 <= q <= 1.0 else 0 for q in quantile_levels.tolist()],
+                       dtype=np.int64)
+    selected = (paths > indices) & (indices > 0)
+    returns, counts = _return_history(xs, window)
+    generators = [np.random.default_rng(sequence) for sequence in np.random.SeedSequence(
+        np.random.default_rng(seed).integers(2 ** 63)).spawn(symbols)]
+
+    changes = np.full((symbols, horizon, len(quantile_levels)), np.nan)
+    chunk = max(1, max_elements // max(paths * horizon, 1))
+    for start in range(0, symbols, chunk):
+        rows = np.arange(start, min(start + chunk, symbols))
+        rows = rows[counts[rows] >= block]
+        if len(rows):
+            simulated = _simulate_log_changes(returns[rows], counts[rows], horizon, paths, block, [generators[row] for row in rows])
+            simulated.sort(axis=-1)
+            changes[rows] = np.where(selected, np.expm1(simulated[..., np.where(selected, indices, 0)]), 0.0)
+
+    targets = xs[:, :1, None] * (1.0 + changes) if xs.shape[1] else changes.copy()
+    columns = {}
+    for h in horizons:
+        for j, q in enumerate(quantile_levels.tolist()):
+            columns[f'change{h}_{q:g}'] = changes[:, h - 1, j]
+            columns[f'target{h}_{q:g}'] = targets[:, h - 1, j]
+    return SimulationResult(DataFrame(columns, index=range(symbols)), changes, targets)
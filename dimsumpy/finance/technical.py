@@ -1,29 +1,126 @@
 
 # STANDARD LIBS
-from typing import List, Optional
-from statistics import mean
+from collections import deque
+from datetime import date
+from itertools import islice
+import re
+from typing import Any, Dict, List, Optional, Tuple
 
+# THIRD PARTY LIBS
+import numpy as np
+from numpy import ndarray
+import pandas
+from pandas import DataFrame
 
+# CUSTOM LIBS
+from dimsumpy.finance.cache import memoized
+from dimsumpy.finance.calendar import TradingCalendar, to_dates, to_ordinals
+from dimsumpy.finance.prices import PriceSeries
 
-def convert_to_changes(n: int, list_x: List[float]) -> List[float]:
+
+def _as_array(xs: Any) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+
+    accepts a list, tuple, ndarray or memoryview of prices. ndarray and float64 memoryview inputs are not copied.
+    """
+    return np.asarray(xs, dtype=np.float64)
+
+
+def convert_to_changes(n: int, list_x: Any, as_list: bool = True) -> Any:
     """
+    DEPENDS ON: _as_array()
+
     convert a list of closing prices to a list of 'changes in n days' 
+    result[i] is (list_x[i] - list_x[i+n]) / list_x[i+n], computed on two shifted views of one array.
+
+    list_x can be a list, ndarray or memoryview. as_list=False returns the ndarray instead of a list.
     """
-    if len(list_x) < n + 1:
-        return []
+    xs = _as_array(list_x)
+    length = xs.shape[-1]
+    if length < n + 1:
+        return [] if as_list else np.empty(xs.shape[:-1] + (0,))
     else:
-        xs = list_x
-        result = []
-        while len(xs) > n:
-            change_in_n_periods = (xs[0] - xs[n]) / xs[n]
-            result.append(change_in_n_periods)
-            xs = xs[1:]
-        return result
+        olds = xs[..., n:]
+        changes = (xs[..., :length - n] - olds) / olds
+        return changes.tolist() if as_list else changes
+
+
+def _decayed_sums(a: float, m: int, us: ndarray, first: Optional[Any] = None) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    USED BY: ema_series(), finance.chunked
+
+    us needs to be ascending in dates (oldest first) along the last axis.
+    result[k] is sum(a ** j * us[k + m - 1 - j] for j in range(m)), that is a decayed sum over a window of m items.
+
+    The first window is summed directly, later windows are updated in O(1) by
+    F(t) = a * F(t-1) + us[t] - a ** m * us[t-m], so the whole series is one linear pass.
+    Rounding errors are multiplied by a < 1 on every step, so they do not accumulate.
+    first continues an earlier pass: it is the decayed sum of us[..., :m] that the earlier pass ended with,
+    so a series split into chunks gets the same floats as one pass over the whole series.
+    """
+    length = us.shape[-1]
+    if first is None:
+        first = us[..., :m] @ (a ** np.arange(m - 1, -1, -1))
+    steps = us[..., m:] - a ** m * us[..., :length - m]
+    if us.ndim == 1:
+        f = float(first)
+        result = [f]
+        for step in steps.tolist():
+            f = a * f + step
+            result.append(f)
+        return np.array(result)
+    else:
+        f = first
+        result = np.empty((length - m + 1,) + us.shape[:-1])
+        result[0] = f
+        for k, step in enumerate(np.moveaxis(steps, -1, 0), start=1):
+            f = a * f + step
+            result[k] = f
+        return np.moveaxis(result, 0, -1)
+
+
+def _seeded_ema(n: int, walks: ndarray, seeds: ndarray) -> ndarray:
+    """
+    * INDEPENDENT *
+    USED BY: ema_series(), finance.chunked
+
+    the EMA from the decayed walk of the newer 2n items (weight * the _decayed_sums() of the prices)
+    and the SMA seed of the older n items of each 3n window.
+    """
+    return walks + (1.0 - 2.0 / (n + 1)) ** (2 * n) * seeds
+
 
+def ema_series(n: int, list_x: Any, seeds: Optional[ndarray] = None) -> ndarray:
+    """
+    DEPENDS ON: _as_array(), _decayed_sums(), rolling_means(), _seeded_ema()
+    USED BY: ema(), emas(), steep_series(), IndicatorGraph
+
+    result[i] equals ema(n, list_x[i:]), the whole series is computed in one linear pass.
+    list_x needs to be descending in dates, the length of the result is len(list_x) - 3 * n + 1.
+
+    ema() seeds every value with the SMA of the oldest n items of a 3n window, then walks the newer 2n items,
+    so each value is weight * sum((1 - weight) ** j * x[j] for j in range(2n)) + (1 - weight) ** 2n * seed.
+    seeds can be a precomputed rolling_means(n, list_x[2n:]), e.g. a slice of the moving averages of a graph.
+    """
+    xs = _as_array(list_x)
+    length = xs.shape[-1]
+    if length < 3 * n:
+        return np.empty(xs.shape[:-1] + (0,))
+    else:
+        weight = 2.0 / (n + 1)
+        walks = _decayed_sums(1.0 - weight, 2 * n, weight * xs[..., ::-1])[..., ::-1]
+        seeds = rolling_means(n, xs[..., 2 * n:]) if seeds is None else seeds
+        return _seeded_ema(n, walks[..., :length - 3 * n + 1], seeds)
 
+
+@memoized(prefix=lambda n: 3 * n)
 def ema(n: int, list_x: List[float]) -> float:
     """
-    USED BY: steep
+    DEPENDS ON: ema_series()
     
     test: listx = [22.17, 22.4, 23.1, 22.68, 23.33, 23.1, 23.19, 23.65, 23.87, 23.82
                   , 23.63, 23.95, 23.83, 23.75, 24.05, 23.36, 22.61, 22.38, 22.39, 22.15
@@ -35,154 +132,1226 @@ def ema(n: int, list_x: List[float]) -> float:
     if m != length:
         return 0.0
     else:
-        def f(em_, x_): return (x_ - em_) * weight + em_
-        weight = 2.0 / (n + 1)
-        first_ma = sma(n, list_m[-n:])
-        em = first_ma
-        xs = list_m[:-n]   # safe
-        while xs:
-            x = xs[-1]  # safe because list is not empty
-            em = f(em, x)
-            xs = xs[:-1]  # safe
-        return em
+        return float(ema_series(n, list_m)[0])
 
 
+@memoized
 def emas(n: int, list_x: List[float]) -> List[float]:
     """
-    USED BY: steep
+    DEPENDS ON: ema_series()
     """
-    min_length = 3 * n - 1
-    result_list = []  # mutate
-    xs = list_x  # mutate
-    while len(xs) > min_length:
-        em = ema(n, xs)
-        result_list.append(em)
-        xs = xs[1:]
-    return result_list
+    return ema_series(n, list_x).tolist()
 
 
-def quantile(q: float, xs: List[float]) -> float:
-    length = len(xs)
+def quantiles(qs: List[float], xs: Any) -> List[float]:
+    """
+    DEPENDS ON: _as_array()
+    IMPORTS: numpy
+    USED BY: quantile()
+
+    the quantile q is the (q * (len(xs) + 1) - 1)th smallest item, the same index convention as before.
+    All quantiles come from one np.partition() call, so xs is never fully sorted.
+    A quantile is 0.0 if q is outside [0, 1] or its index is outside (0, len(xs)).
+    """
+    values = _as_array(xs)
+    length = len(values)
     n = length + 1
-    i = int(q * n - 1.0)
-    if not xs or q < 0.0 or q > 1.0:
-        return 0.0
-    elif length > i > 0:
-        return sorted(xs)[i]
-    else:
-        return 0.0
+    indices = [int(q * n - 1.0) if 0.0 <= q <= 1.0 else 0 for q in qs]
+    kth = sorted({i for i in indices if length > i > 0})
+    partitioned = np.partition(values, kth) if kth else values
+    return [float(partitioned[i]) if length > i > 0 else 0.0 for i in indices]
+
+
+@memoized
+def quantile(q: float, xs: List[float]) -> float:
+    """
+    DEPENDS ON: quantiles()
+    """
+    return quantiles([q], xs)[0]
+
 
+class _RankTree:
+    """
+    USED BY: rolling_quantiles()
 
-def deltas(n: int, list_x: List[float]) -> List[float]:
+    A Fenwick tree of counts over the ranks 0 .. size - 1, used as a sorted window.
+    add() inserts (delta=1) or evicts (delta=-1) a rank in O(log size),
+    select(k) returns the rank of the kth smallest item (k starts from 0) in O(log size).
     """
-    USED BY: calculate_rsi()
+    __slots__ = ('size', 'tree', 'top')
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.top = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, rank: int, delta: int) -> None:
+        i = rank + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def select(self, k: int) -> int:
+        position = 0
+        remaining = k + 1
+        step = self.top
+        while step:
+            upper = position + step
+            if upper <= self.size and self.tree[upper] < remaining:
+                position = upper
+                remaining -= self.tree[upper]
+            step >>= 1
+        return position
+
+
+def rolling_quantiles(qs: List[float], w: int, xs: Any) -> ndarray:
     """
+    DEPENDS ON: _as_array(), _RankTree
+    IMPORTS: numpy
 
-    if len(list_x) < n + 1:
-        return []
+    result[j, i] equals quantile(qs[j], xs[i:i+w]), the shape is (len(qs), len(xs) - w + 1).
+    xs needs to be descending in dates. The window slides from the oldest date to the latest date,
+    each step inserts one newer item and evicts one older item from a sorted window in O(log len(xs)).
+
+    For the target prices of every date, the 20-day changes of a 501-day window are 481 items:
+        rolling_quantiles([0.98, 0.02], 481, convert_to_changes(20, prices, as_list=False))
+    """
+    values = _as_array(xs)
+    length = len(values)
+    if w < 1 or length < w:
+        return np.zeros((len(qs), 0))
     else:
-        xs = list_x
-        result = []
-        while len(xs) > n:
-            diff = xs[0] - xs[n]
-            result.append(diff)
-            xs = xs[1:]
+        order = np.argsort(values, kind='stable')
+        ranks = np.empty(length, dtype=np.int64)
+        ranks[order] = np.arange(length)
+        sorted_values = values[order].tolist()
+        indices = [int(q * (w + 1) - 1.0) if 0.0 <= q <= 1.0 else 0 for q in qs]
+        selections = [(j, k) for j, k in enumerate(indices) if w > k > 0]
+        rank_list = ranks.tolist()
+        window = _RankTree(length)
+        for rank in rank_list[length - w:]:
+            window.add(rank, 1)
+        result = np.zeros((len(qs), length - w + 1))
+        for i in range(length - w, -1, -1):
+            if i < length - w:
+                window.add(rank_list[i], 1)
+                window.add(rank_list[i + w], -1)
+            for j, k in selections:
+                result[j, i] = sorted_values[window.select(k)]
         return result
 
 
+def deltas(n: int, list_x: Any, as_list: bool = True) -> Any:
+    """
+    DEPENDS ON: _as_array()
+    USED BY: calculate_rsi(), rsi_series(), rsi_matrix()
+
+    result[i] is list_x[i] - list_x[i+n], computed on two shifted views of one array.
+
+    list_x can be a list, ndarray or memoryview. as_list=False returns the ndarray instead of a list.
+    """
+    xs = _as_array(list_x)
+    length = xs.shape[-1]
+    if length < n + 1:
+        return [] if as_list else np.empty(xs.shape[:-1] + (0,))
+    else:
+        diffs = xs[..., :length - n] - xs[..., n:]
+        return diffs.tolist() if as_list else diffs
+
+
+
+def _wilder_averages(n: int, moves: ndarray, count: int) -> ndarray:
+    """
+    DEPENDS ON: _decayed_sums()
+    USED BY: _rsi_values()
+
+    moves are the gains (or losses) of deltas(1, xs), descending in dates.
+    result[i] is the average that calculate_rsi() gets for xs[i:], for the first count dates.
+
+    calculate_rsi() seeds the average with the sum of every move older than 13n moves divided by n,
+    then walks the newer 13n moves with avg = (avg * (n - 1) + x) / n,
+    so each average is a decayed sum of 13n moves plus ((n - 1) / n) ** 13n * seed.
+    """
+    m = 13 * n
+    decay = (n - 1) / n
+    walks = _decayed_sums(decay, m, moves[..., m + count - 2::-1] / n)[..., ::-1]
+    seeds = np.cumsum(moves[..., ::-1], axis=-1)[..., ::-1][..., m:m + count] / n
+    return walks + decay ** m * seeds
+
+
+def _rsi_values(n: int, diffs: ndarray, count: int) -> ndarray:
+    """
+    DEPENDS ON: _wilder_averages(), _rsi_from_averages()
+    USED BY: calculate_rsi(), rsi_series(), rsi_matrix()
+
+    diffs is deltas(1, xs), it must have at least 14 * n + count - 1 items.
+    rs is 0.0 when the average loss is 0, the same as calculate_rsi().
+    """
+    avg_gains = _wilder_averages(n, np.maximum(diffs, 0.0), count)
+    avg_losses = _wilder_averages(n, np.maximum(-diffs, 0.0), count)
+    return _rsi_from_averages(avg_gains, avg_losses)
 
+
+def _rsi_from_averages(avg_gains: ndarray, avg_losses: ndarray) -> ndarray:
+    """
+    USED BY: _rsi_values(), _period_rsi_values(), IndicatorGraph
+    """
+    rs = np.divide(avg_gains, avg_losses, out=np.zeros_like(avg_gains), where=avg_losses != 0)
+    return 100.0 - 100.0 / (1.0 + rs)
+
+
+@memoized
 def calculate_rsi(n: int, xs: List[float]) -> Optional[float]:
     """
-    DEPENDS ON: deltas() 
+    DEPENDS ON: deltas(), _rsi_values()
     calculate_rsi(listb * 100)
     
     typical RSI input list needs to be at least 14 * 14 + 1 days, that is 197 trading days.
     Weekly RSI requires 197 * 5, approximately 1000 trading days (4 years)
 
+    the first average gain and loss are the sums of all gains and losses older than 13n days, divided by n.
     """
     minimum_length = 14 * n + 1
     if len(xs) < minimum_length:
         return None
     else:
-        def f(x_, avg): return (avg * (n - 1) + x_) / n
-        init_list = xs[: 13 * n + 1]
-        tail_list = xs[13 * n:]    # length is n + 1
-        tail_diff = deltas(1, tail_list)
-        first_avg_gain = sum(filter(lambda a: a > 0.0, tail_diff)) / n
-        first_avg_loss = -(sum(filter(lambda a: a < 0.0, tail_diff))) / n  # mypy error using abs
-        init_diff = deltas(1, init_list)
-        gain_list = list(map(lambda a: a if a > 0.0 else 0.0, init_diff))
-        loss_list = list(map(lambda a: abs(a) if a < 0.0 else 0.0, init_diff))
-        avg_gain = first_avg_gain  # mutate
-        g_list = gain_list         # mutate
-        while g_list:
-            x = g_list[-1]
-            avg_gain = f(x, avg_gain)
-            g_list = g_list[:-1]
-        avg_loss = first_avg_loss   # mutate
-        l_list = loss_list         # mutate
-        while l_list:
-            x = l_list[-1]
-            avg_loss = f(x, avg_loss)
-            l_list = l_list[:-1]
-        rs = avg_gain / avg_loss if avg_loss != 0 else 0.0
-        rs_index = 100.0 - (100.0 / (1.0 + rs))
-        return rs_index
+        return float(_rsi_values(n, deltas(1, xs, as_list=False), 1)[0])
+
+
+def rsi_series(n: int, prices: Any) -> ndarray:
+    """
+    DEPENDS ON: deltas(), _rsi_values()
+
+    result[i] equals calculate_rsi(n, prices[i:]), every date is computed in one linear pass.
+    prices needs to be descending in dates, the length of the result is len(prices) - 14 * n,
+    so a 3-year backfill of daily RSI needs 3 years + 197 trading days of prices.
+    """
+    xs = _as_array(prices)
+    length = xs.shape[-1]
+    if length < 14 * n + 1:
+        return np.empty(xs.shape[:-1] + (0,))
+    else:
+        return _rsi_values(n, deltas(1, xs, as_list=False), length - 14 * n)
+
+
+def _centered_sums(xs: ndarray) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    USED BY: rolling_means(), IndicatorGraph
+
+    the cumulative sum of (x - first price) with a leading 0, so rounding errors do not grow with the price level.
+    """
+    sums = np.zeros(xs.shape[:-1] + (xs.shape[-1] + 1,))
+    np.cumsum(xs - xs[..., :1], axis=-1, out=sums[..., 1:])
+    return sums
+
+
+def rolling_means(n: int, list_x: Any, sums: Optional[ndarray] = None) -> ndarray:
+    """
+    DEPENDS ON: _as_array(), _centered_sums()
+    USED BY: sma(), smas(), ema_series(), steep_series(), IndicatorGraph
+
+    result[i] is the mean of list_x[i:i+n], the whole series is computed in one pass from a cumulative sum.
+    list_x needs to be descending in dates, so result[0] is the latest moving average.
+    The length of the result is len(list_x) - n + 1, an empty array if list_x is shorter than n.
+    sums can be a precomputed _centered_sums(list_x), so moving averages of several n share one cumulative sum.
+    """
+    xs = _as_array(list_x)
+    if xs.shape[-1] < n:
+        return np.empty(xs.shape[:-1] + (0,))
+    else:
+        sums = _centered_sums(xs) if sums is None else sums
+        return (sums[..., n:] - sums[..., :-n]) / n + xs[..., :1]
 
 
+@memoized(prefix=lambda n: n)
 def sma(n: int, xs: List[float]) -> Optional[float]:
     """
-    IMPORTS: mean()
+    DEPENDS ON: rolling_means()
 
     Simple Moving Average
     """
     if n > len(xs):
         return None
     else:
-        return mean(xs[:n])
+        return float(rolling_means(n, xs[:n])[0])
 
 
+@memoized
 def smas(n: int, list_x: List[float]) -> List[float]:
     """
+    DEPENDS ON: rolling_means()
+
     List of Simple Moving Averages
     mu is greek letter mu which denotes mean
 
     """
-    result_list = []
-    xs = list_x
-    while len(xs) > (n - 1):
-        mu = sma(n, xs)
-        result_list.append(mu)
-        xs = xs[1:]
-    return result_list
+    return rolling_means(n, list_x).tolist()
 
 
+@memoized(prefix=lambda n: 3 * n + 5)
 def steep(n: int, xs: List[float]) -> Optional[float]:
     """
-    DEPENDS ON: ema, emas
+    DEPENDS ON: steep_series()
 
     steep20 requires minimum length of list_x = 20 * 3 + 5 = 65
     steep50 requires minimum length of list_x = 50 * 3 + 5 = 155
 
-    em_list needs to skip the first value because first value is already calculated as em_value, which is a base for delta() function.
-
     steep lower than 1000 is in downtrend.
     """
-    def delta(x): 
-        return (em_value - x) / em_value + 1
-    
     minimum_length = n * 3 + 5
     if len(xs) >= minimum_length:
         short_list = xs[:minimum_length]  # do not use list as variable name
-        em_value = ema(n, short_list)
-        em_list = emas(n, short_list[1:])
-        delta_list = list(map(delta, em_list))
-        steepness = mean(delta_list) * 1000
-        return steepness
+        return float(steep_series(n, short_list)[0])
     else:
         return None
 
 
+def steep_series(n: int, prices: Any, em_series: Optional[ndarray] = None) -> ndarray:
+    """
+    DEPENDS ON: ema_series(), rolling_means()
+    USED BY: steep(), IndicatorGraph
+
+    result[i] equals steep(n, prices[i:]), every date reuses one EMA series.
+    prices needs to be descending in dates, the length of the result is len(prices) - 3 * n - 4.
+
+    steep(n, xs) takes the EMA of xs as em_value and the EMAs of the next 5 older dates as em_list,
+    steepness is mean((em_value - em) / em_value + 1 for em in em_list) * 1000,
+    which is (em_value - mean(em_list)) / em_value + 1, so mean(em_list) is a 5-item rolling mean of the EMA series.
+    em_series can be a precomputed ema_series(n, prices).
+    """
+    em_series = ema_series(n, prices) if em_series is None else em_series
+    if em_series.shape[-1] < 6:
+        return np.empty(em_series.shape[:-1] + (0,))
+    else:
+        em_values = em_series[..., :-5]
+        em_means = rolling_means(5, em_series[..., 1:])
+        return ((em_values - em_means) / em_values + 1) * 1000
+
+
+def _window_sums(n: int, xs: ndarray) -> ndarray:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    USED BY: rolling_regression(), _log_return_moments(), finance.correlation, finance.ohlcv
+
+    result[..., i] is the sum of xs[..., i:i+n] from one cumulative sum, the length is len(xs) - n + 1.
+    """
+    sums = np.zeros(xs.shape[:-1] + (xs.shape[-1] + 1,))
+    np.cumsum(xs, axis=-1, out=sums[..., 1:])
+    return sums[..., n:] - sums[..., :-n]
+
+
+def rolling_regression(n: int, prices: Any) -> Tuple[ndarray, ndarray]:
+    """
+    DEPENDS ON: _as_array(), _window_sums()
+    IMPORTS: numpy
+
+    the OLS slope and R squared of prices[i:i+n] against time, for every date in one pass of running sums.
+    prices needs to be descending in dates, time counts up to the latest date, so an uptrend has a positive slope.
+    The slope is in price units per day, pass np.log(prices) for the continuously compounded daily trend.
+    The length of both results is len(prices) - n + 1, R squared is 0.0 for a flat window.
+
+    With j the position in the window (0 is the latest), sum(j * y) is sum(k * y) - i * sum(y) over the global positions k,
+    so sum(y), sum(k * y) and sum(y * y) are the only running sums. y is taken relative to the first price for precision.
+    """
+    xs = _as_array(prices)
+    length = xs.shape[-1]
+    if length < n or n < 2:
+        empty = np.empty(xs.shape[:-1] + (0,))
+        return empty, empty.copy()
+    else:
+        ys = xs - xs[..., :1]
+        positions = np.arange(length, dtype=np.float64)
+        sum_y = _window_sums(n, ys)
+        sum_jy = _window_sums(n, positions * ys) - positions[:length - n + 1] * sum_y
+        sum_ty = (n - 1) * sum_y - sum_jy
+        sum_t = n * (n - 1) / 2.0
+        sum_tt = (n - 1) * n * (2 * n - 1) / 6.0
+        sxx = n * sum_tt - sum_t * sum_t
+        sxy = n * sum_ty - sum_t * sum_y
+        syy = np.maximum(n * _window_sums(n, ys * ys) - sum_y * sum_y, 0.0)
+        r_squares = np.divide(sxy * sxy, sxx * syy, out=np.zeros_like(syy), where=syy > 0.0)
+        return sxy / sxx, np.minimum(r_squares, 1.0)
+
+
+def _log_return_moments(n: int, prices: Any) -> Tuple[ndarray, ndarray]:
+    """
+    DEPENDS ON: _as_array(), _window_sums()
+    USED BY: rolling_volatility(), rolling_sharpe()
+
+    the mean and the sample variance of the n daily log returns of prices[i:i+n+1], the length is len(prices) - n.
+    """
+    xs = _as_array(prices)
+    if xs.shape[-1] < n + 1 or n < 2:
+        empty = np.empty(xs.shape[:-1] + (0,))
+        return empty, empty.copy()
+    else:
+        returns = np.log(xs[..., :-1] / xs[..., 1:])
+        sums = _window_sums(n, returns)
+        squares = _window_sums(n, returns * returns)
+        return sums / n, np.maximum(squares - sums * sums / n, 0.0) / (n - 1)
+
+
+def _annualized_moments(means: ndarray, variances: ndarray, periods: int, rate: float) -> Tuple[ndarray, ndarray]:
+    """
+    * INDEPENDENT *
+    IMPORTS: numpy
+    USED BY: rolling_volatility(), rolling_sharpe(), IndicatorGraph
+
+    the annualized volatility and Sharpe ratio from the daily log return moments of _log_return_moments(),
+    rate is the annual risk-free rate, the Sharpe ratio is NaN where the returns do not vary.
+    """
+    deviations = np.sqrt(variances)
+    excess = means - rate / periods
+    sharpes = np.divide(excess, deviations, out=np.full_like(excess, np.nan), where=deviations > 0) * np.sqrt(periods)
+    return deviations * np.sqrt(periods), sharpes
+
+
+def rolling_volatility(n: int, prices: Any, periods: int = 252) -> ndarray:
+    """
+    DEPENDS ON: _log_return_moments(), _annualized_moments()
+
+    result[i] is the annualized standard deviation of the n daily log returns of prices[i:i+n+1].
+    prices needs to be descending in dates, the length of the result is len(prices) - n.
+    """
+    return _annualized_moments(*_log_return_moments(n, prices), periods, 0.0)[0]
+
+
+def rolling_sharpe(n: int, prices: Any, periods: int = 252, rate: float = 0.0) -> ndarray:
+    """
+    DEPENDS ON: _log_return_moments(), _annualized_moments()
+
+    result[i] is the annualized Sharpe ratio of the n daily log returns of prices[i:i+n+1],
+    rate is the annual risk-free rate, NaN where the returns do not vary.
+    prices needs to be descending in dates, the length of the result is len(prices) - n.
+    """
+    return _annualized_moments(*_log_return_moments(n, prices), periods, rate)[1]
+
+
+def rolling_max_drawdown(n: int, prices: Any) -> ndarray:
+    """
+    DEPENDS ON: _as_array()
+    IMPORTS: numpy
+
+    result[i] is the max drawdown inside the n dates prices[i:i+n], as a negative fraction (0.0 is no drawdown),
+    that is the lowest price / highest earlier price - 1 with both prices in the window.
+    prices needs to be descending in dates, the length of the result is len(prices) - n + 1.
+
+    A segment is summed up by (peak, trough, drawdown), and an older segment L followed by a newer segment R combine as
+    drawdown(L + R) = min(drawdown(L), drawdown(R), trough(R) / peak(L) - 1), which is associative.
+    So this is the van Herk / Gil-Werman pass of _window_extremes() over that combine: in blocks of n dates,
+    the running (trough, drawdown) forwards and (peak, drawdown) backwards inside each block,
+    then every window is one block suffix plus the next block prefix, and the cost is O(len) whatever n is.
+    """
+    xs = _as_array(prices)
+    length = xs.shape[-1]
+    if length < n or n < 1:
+        return np.empty(xs.shape[:-1] + (0,))
+    else:
+        count = length - n + 1
+        blocks = -(-length // n)
+        padded = np.full(xs.shape[:-1] + (blocks * n,), np.nan)
+        padded[..., :length] = xs[..., ::-1]
+        shaped = padded.reshape(xs.shape[:-1] + (blocks, n))
+        backwards = shaped[..., ::-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prefix_troughs = np.fmin.accumulate(shaped, axis=-1).reshape(padded.shape)
+            prefix_drawdowns = np.fmin.accumulate(shaped / np.fmax.accumulate(shaped, axis=-1) - 1.0, axis=-1)
+            suffix_peaks = np.fmax.accumulate(backwards, axis=-1)[..., ::-1].reshape(padded.shape)
+            suffix_drawdowns = np.fmin.accumulate(np.fmin.accumulate(backwards, axis=-1) / backwards - 1.0, axis=-1)
+            suffixes = suffix_drawdowns[..., ::-1].reshape(padded.shape)[..., :count]
+            prefixes = prefix_drawdowns.reshape(padded.shape)[..., n - 1:n - 1 + count]
+            crossings = prefix_troughs[..., n - 1:n - 1 + count] / suffix_peaks[..., :count] - 1.0
+        result = np.fmin(np.fmin(suffixes, prefixes), crossings)
+        aligned = np.arange(count) % n == 0  # the window is one whole block, its suffix alone
+        result[..., aligned] = suffixes[..., aligned]
+        return result[..., ::-1]
+
+
+def price_matrix(price_lists: List[List[float]]) -> ndarray:
+    """
+    IMPORTS: numpy
+    USED BY: sma_matrix(), ema_matrix(), rsi_matrix(), steep_matrix(), changes_matrix()
+
+    stack one descending price list per symbol into a (symbols x days) matrix.
+    column 0 is the latest date of every symbol, shorter histories are padded with NaN at the oldest end.
+    """
+    width = max((len(xs) for xs in price_lists), default=0)
+    matrix = np.full((len(price_lists), width), np.nan)
+    for row, xs in zip(matrix, price_lists):
+        row[:len(xs)] = xs
+    return matrix
+
+
+def sma_matrix(n: int, matrix: Any) -> ndarray:
+    """
+    DEPENDS ON: rolling_means()
+
+    result[s] equals sma(n, prices of symbol s), NaN where sma() returns None.
+    matrix is (symbols x days), descending in dates and NaN-padded, see price_matrix().
+    """
+    xs = _as_array(matrix)
+    if xs.shape[-1] < n:
+        return np.full(xs.shape[0], np.nan)
+    else:
+        return rolling_means(n, xs[:, :n])[:, 0]
+
+
+def ema_matrix(n: int, matrix: Any) -> ndarray:
+    """
+    DEPENDS ON: ema_series()
+
+    result[s] equals ema(n, prices of symbol s), NaN where ema() returns 0.0 for a short history.
+    matrix is (symbols x days), descending in dates and NaN-padded, see price_matrix().
+    """
+    xs = _as_array(matrix)
+    if xs.shape[-1] < 3 * n:
+        return np.full(xs.shape[0], np.nan)
+    else:
+        return ema_series(n, xs[:, :3 * n])[:, 0]
+
+
+def rsi_matrix(n: int, matrix: Any) -> ndarray:
+    """
+    DEPENDS ON: deltas(), _rsi_values()
+
+    result[s] equals calculate_rsi(n, prices of symbol s), NaN where calculate_rsi() returns None.
+    matrix is (symbols x days), descending in dates and NaN-padded, see price_matrix().
+
+    the NaN moves of the padding count as 0 in the first average gain and loss,
+    so each symbol is seeded from its own history only.
+    """
+    xs = _as_array(matrix)
+    if xs.shape[-1] < 14 * n + 1:
+        return np.full(xs.shape[0], np.nan)
+    else:
+        diffs = deltas(1, xs, as_list=False)
+        values = _rsi_values(n, np.where(np.isnan(diffs), 0.0, diffs), 1)[:, 0]
+        lengths = np.count_nonzero(~np.isnan(xs), axis=1)
+        return np.where(lengths >= 14 * n + 1, values, np.nan)
+
+
+def steep_matrix(n: int, matrix: Any) -> ndarray:
+    """
+    DEPENDS ON: steep_series()
+
+    result[s] equals steep(n, prices of symbol s), NaN where steep() returns None.
+    matrix is (symbols x days), descending in dates and NaN-padded, see price_matrix().
+    """
+    xs = _as_array(matrix)
+    if xs.shape[-1] < 3 * n + 5:
+        return np.full(xs.shape[0], np.nan)
+    else:
+        return steep_series(n, xs[:, :3 * n + 5])[:, 0]
+
+
+def changes_matrix(n: int, matrix: Any) -> ndarray:
+    """
+    DEPENDS ON: convert_to_changes()
+
+    result[s] equals convert_to_changes(n, prices of symbol s), the shape is (symbols x (days - n)).
+    matrix is (symbols x days), descending in dates and NaN-padded, see price_matrix().
+    changes that reach into the padding are NaN.
+    """
+    return convert_to_changes(n, _as_array(matrix), as_list=False)
+
+
+
+class StreamingSMA:
+    """
+    IMPORTS: deque
+
+    O(1) daily update of sma(n, prices). update() takes one price at a time in ascending date order,
+    and returns the latest value, None until n prices have been seen.
+    The running total is re-summed once every n updates, so rounding errors do not accumulate.
+
+    to_state() returns plain lists and floats that can be stored as JSON, from_state() restores the object.
+    """
+    __slots__ = ('n', 'window', 'total', 'count')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.window: deque = deque(maxlen=n)
+        self.total = 0.0
+        self.count = 0
+
+    @classmethod
+    def from_prices(cls, n: int, prices: List[float]) -> 'StreamingSMA':
+        """ prices needs to be descending in dates, the same as sma() """
+        obj = cls(n)
+        for price in reversed(prices):
+            obj.update(price)
+        return obj
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.total / self.n if len(self.window) == self.n else None
+
+    def update(self, price: float) -> Optional[float]:
+        if len(self.window) == self.n:
+            self.total -= self.window[0]
+        self.window.append(price)
+        self.total += price
+        self.count += 1
+        if self.count >= self.n:
+            self.total = sum(self.window)
+            self.count = 0
+        return self.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'n': self.n, 'window': list(self.window), 'total': self.total, 'count': self.count}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingSMA':
+        obj = cls(state['n'])
+        obj.window.extend(state['window'])
+        obj.total = state['total']
+        obj.count = state['count']
+        return obj
+
+
+class StreamingEMA:
+    """
+    IMPORTS: deque, islice
+
+    O(1) daily update of ema(n, prices), with the same 3n window and SMA seed as ema_series().
+    update() takes one price at a time in ascending date order, and returns None until 3n prices have been seen.
+
+    walk is the decayed sum of the latest 2n prices, seed_total is the sum of the oldest n prices of the window.
+    The price that leaves the walk is the price that enters the seed, so both are updated in O(1).
+    """
+    __slots__ = ('n', 'window', 'walk', 'seed_total', 'count')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.window: deque = deque(maxlen=3 * n)
+        self.walk = 0.0
+        self.seed_total = 0.0
+        self.count = 0
+
+    @classmethod
+    def from_prices(cls, n: int, prices: List[float]) -> 'StreamingEMA':
+        """ prices needs to be descending in dates, the same as ema() """
+        obj = cls(n)
+        for price in reversed(prices):
+            obj.update(price)
+        return obj
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.window) < 3 * self.n:
+            return None
+        else:
+            decay = 1.0 - 2.0 / (self.n + 1)
+            return self.walk + decay ** (2 * self.n) * self.seed_total / self.n
+
+    def update(self, price: float) -> Optional[float]:
+        n = self.n
+        weight = 2.0 / (n + 1)
+        decay = 1.0 - weight
+        was_full = len(self.window) == 3 * n
+        leaving = self.window[0] if was_full else 0.0
+        self.window.append(price)
+        if was_full:
+            entering = self.window[n - 1]
+            self.walk = decay * self.walk + weight * price - decay ** (2 * n) * weight * entering
+            self.seed_total += entering - leaving
+            self.count += 1
+            if self.count >= n:
+                self.seed_total = sum(islice(self.window, n))
+                self.count = 0
+        elif len(self.window) == 3 * n:
+            walk_prices = list(islice(self.window, n, 3 * n))
+            self.walk = sum(weight * decay ** j * x for j, x in enumerate(reversed(walk_prices)))
+            self.seed_total = sum(islice(self.window, n))
+        return self.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'n': self.n, 'window': list(self.window), 'walk': self.walk, 'seed_total': self.seed_total, 'count': self.count}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingEMA':
+        obj = cls(state['n'])
+        obj.window.extend(state['window'])
+        obj.walk = state['walk']
+        obj.seed_total = state['seed_total']
+        obj.count = state['count']
+        return obj
+
+
+class StreamingRSI:
+    """
+    IMPORTS: deque
+
+    O(1) daily update of calculate_rsi(n, prices), where prices are all the prices seen so far.
+    update() takes one price at a time in ascending date order, and returns None until 14 * n + 1 prices have been seen.
+
+    gains and losses hold the latest 13n moves, their Wilder walks are decayed sums updated in O(1).
+    A move that leaves the walk is added to gain_seed or loss_seed, which are the sums of all older moves.
+    """
+    __slots__ = ('n', 'last_price', 'gains', 'losses', 'gain_walk', 'loss_walk', 'gain_seed', 'loss_seed', 'seed_count')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.last_price: Optional[float] = None
+        self.gains: deque = deque(maxlen=13 * n)
+        self.losses: deque = deque(maxlen=13 * n)
+        self.gain_walk = 0.0
+        self.loss_walk = 0.0
+        self.gain_seed = 0.0
+        self.loss_seed = 0.0
+        self.seed_count = 0
+
+    @classmethod
+    def from_prices(cls, n: int, prices: List[float]) -> 'StreamingRSI':
+        """ prices needs to be descending in dates, the same as calculate_rsi() """
+        obj = cls(n)
+        for price in reversed(prices):
+            obj.update(price)
+        return obj
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.seed_count < self.n:
+            return None
+        else:
+            fade = ((self.n - 1) / self.n) ** (13 * self.n)
+            avg_gain = self.gain_walk + fade * self.gain_seed / self.n
+            avg_loss = self.loss_walk + fade * self.loss_seed / self.n
+            rs = avg_gain / avg_loss if avg_loss != 0 else 0.0
+            return 100.0 - (100.0 / (1.0 + rs))
+
+    def update(self, price: float) -> Optional[float]:
+        if self.last_price is not None:
+            n = self.n
+            m = 13 * n
+            decay = (n - 1) / n
+            diff = price - self.last_price
+            gain = diff if diff > 0.0 else 0.0
+            loss = -diff if diff < 0.0 else 0.0
+            if len(self.gains) == m:
+                old_gain = self.gains[0]
+                old_loss = self.losses[0]
+                self.gains.append(gain)
+                self.losses.append(loss)
+                self.gain_walk = decay * self.gain_walk + gain / n - decay ** m * old_gain / n
+                self.loss_walk = decay * self.loss_walk + loss / n - decay ** m * old_loss / n
+                self.gain_seed += old_gain
+                self.loss_seed += old_loss
+                self.seed_count += 1
+            else:
+                self.gains.append(gain)
+                self.losses.append(loss)
+                if len(self.gains) == m:
+                    self.gain_walk = sum(decay ** j * x / n for j, x in enumerate(reversed(self.gains)))
+                    self.loss_walk = sum(decay ** j * x / n for j, x in enumerate(reversed(self.losses)))
+        self.last_price = price
+        return self.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'n': self.n, 'last_price': self.last_price, 'gains': list(self.gains), 'losses': list(self.losses),
+            'gain_walk': self.gain_walk, 'loss_walk': self.loss_walk,
+            'gain_seed': self.gain_seed, 'loss_seed': self.loss_seed, 'seed_count': self.seed_count,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingRSI':
+        obj = cls(state['n'])
+        obj.last_price = state['last_price']
+        obj.gains.extend(state['gains'])
+        obj.losses.extend(state['losses'])
+        obj.gain_walk = state['gain_walk']
+        obj.loss_walk = state['loss_walk']
+        obj.gain_seed = state['gain_seed']
+        obj.loss_seed = state['loss_seed']
+        obj.seed_count = state['seed_count']
+        return obj
+
+
+class StreamingSteep:
+    """
+    DEPENDS ON: StreamingEMA
+    IMPORTS: deque
+
+    O(1) daily update of steep(n, prices), from the latest 6 values of a StreamingEMA.
+    update() takes one price at a time in ascending date order, and returns None until 3 * n + 5 prices have been seen.
+    """
+    __slots__ = ('n', 'ema', 'ems')
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.ema = StreamingEMA(n)
+        self.ems: deque = deque(maxlen=6)
+
+    @classmethod
+    def from_prices(cls, n: int, prices: List[float]) -> 'StreamingSteep':
+        """ prices needs to be descending in dates, the same as steep() """
+        obj = cls(n)
+        for price in reversed(prices):
+            obj.update(price)
+        return obj
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.ems) < 6:
+            return None
+        else:
+            em_value = self.ems[-1]
+            em_mean = sum(islice(self.ems, 5)) / 5
+            return ((em_value - em_mean) / em_value + 1) * 1000
+
+    def update(self, price: float) -> Optional[float]:
+        em = self.ema.update(price)
+        if em is not None:
+            self.ems.append(em)
+        return self.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'n': self.n, 'ema': self.ema.to_state(), 'ems': list(self.ems)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingSteep':
+        obj = cls(state['n'])
+        obj.ema = StreamingEMA.from_state(state['ema'])
+        obj.ems.extend(state['ems'])
+        return obj
+
+
+
+def _window_extremes(extreme: np.ufunc, w: int, xs: ndarray) -> ndarray:
+    """
+    IMPORTS: numpy
+    USED BY: forward_max(), forward_min(), backward_max(), backward_min(), finance.ohlcv
+
+    result[..., i] is extreme.reduce(xs[..., i:i+w]) for every full window, extreme is np.fmax or np.fmin so NaN is skipped.
+    van Herk / Gil-Werman: cut xs into blocks of w items, take the running extreme forwards and backwards inside each block,
+    then every window is one block suffix plus the next block prefix, so the cost is O(len) whatever w is.
+    """
+    length = xs.shape[-1]
+    count = length - w + 1
+    blocks = -(-length // w)
+    padded = np.full(xs.shape[:-1] + (blocks * w,), np.nan)
+    padded[..., :length] = xs
+    shaped = padded.reshape(xs.shape[:-1] + (blocks, w))
+    prefixes = extreme.accumulate(shaped, axis=-1).reshape(padded.shape)
+    suffixes = extreme.accumulate(shaped[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    return extreme(suffixes[..., :count], prefixes[..., w - 1:w - 1 + count])
+
+
+def _shifted_extremes(extreme: np.ufunc, w: int, xs: Any, later: bool) -> ndarray:
+    """
+    DEPENDS ON: _as_array(), _window_extremes()
+    USED BY: forward_max(), forward_min(), backward_max(), backward_min()
+    """
+    values = _as_array(xs)
+    length = values.shape[-1]
+    padding = np.full(values.shape[:-1] + (w,), np.nan)
+    if later:
+        padded = np.concatenate((padding, values), axis=-1)
+    else:
+        padded = np.concatenate((values[..., 1:], padding), axis=-1)
+    return _window_extremes(extreme, w, padded)[..., :length]
+
+
+def forward_max(w: int, xs: Any) -> ndarray:
+    """
+    DEPENDS ON: _shifted_extremes()
+
+    result[i] is the max of the w dates after date i, that is max(xs[i-w:i]) because xs is descending in dates.
+    The windows of the latest dates are shorter, result[0] is NaN. xs can be a (symbols x days) matrix.
+    """
+    return _shifted_extremes(np.fmax, w, xs, later=True)
+
+
+def forward_min(w: int, xs: Any) -> ndarray:
+    """
+    DEPENDS ON: _shifted_extremes()
+
+    result[i] is the min of the w dates after date i, see forward_max().
+    """
+    return _shifted_extremes(np.fmin, w, xs, later=True)
+
+
+def backward_max(w: int, xs: Any) -> ndarray:
+    """
+    DEPENDS ON: _shifted_extremes()
+
+    result[i] is the max of the w dates before date i, that is max(xs[i+1:i+1+w]) because xs is descending in dates.
+    The windows of the oldest dates are shorter, result[-1] is NaN. xs can be a (symbols x days) matrix.
+    """
+    return _shifted_extremes(np.fmax, w, xs, later=False)
+
+
+def backward_min(w: int, xs: Any) -> ndarray:
+    """
+    DEPENDS ON: _shifted_extremes()
+
+    result[i] is the min of the w dates before date i, see backward_max().
+    """
+    return _shifted_extremes(np.fmin, w, xs, later=False)
+
+
+def check_tops_bottoms(xs: Any, w: int = 50, minimum: int = 49) -> Any:
+    """
+    DEPENDS ON: forward_max(), forward_min()
+    USED BY: compute_technical_frame()
+
+    the check_top_bottom() of the price pipeline for every date at once.
+    is_top[i] is 1.0 if xs[i] is higher than each of the next w prices, is_bottom[i] is 1.0 if it is lower than each of them,
+    NaN if fewer than minimum later prices exist (the length > 48 rule) or the price is 0 or NaN.
+    xs is descending in dates, it can be a (symbols x days) matrix, the result is a tuple of two float arrays.
+    """
+    values = _as_array(xs)
+    counts = np.minimum(np.arange(values.shape[-1]), w)
+    enough = (counts >= minimum) & _truthy(values)
+    is_top = np.where(enough, values > forward_max(w, values), np.nan)
+    is_bottom = np.where(enough, values < forward_min(w, values), np.nan)
+    return is_top, is_bottom
+
+
+TECHNICAL_COLUMNS: List[str] = [
+    'ma20', 'ma50', 'ma250', 'steep20', 'steep50', 'steep250', 'ma50_distance', 'ma250_distance',
+    'rsi', 'weekly_rsi', 'is_top', 'is_bottom',
+    'price', 'p20', 'p50', 'p100', 'p200', 'p500',
+    'increase20', 'decrease20', 'increase50', 'decrease50',
+    'best20', 'worst20', 'best50', 'worst50',
+    'gain20', 'fall20', 'gain50', 'fall50',
+]
+
+
+def _pad(values: ndarray, length: int) -> ndarray:
+    """
+    * INDEPENDENT *
+
+    pad a descending series with NaN at the oldest end, so that result[i] belongs to the ith date.
+    """
+    result = np.full(length, np.nan)
+    result[:min(len(values), length)] = values[:length]
+    return result
+
+
+def _truthy(xs: ndarray) -> ndarray:
+    """ the vectorized 'if x' of the price pipeline, where None is NaN """
+    return ~np.isnan(xs) & (xs != 0.0)
+
+
+def _counts_since(ordinals: ndarray, days: ndarray) -> ndarray:
+    """
+    * INDEPENDENT *
+    USED BY: period_rsi_series(), compute_technical_frame()
+
+    ordinals are descending, result[i] is the number of them on or after days[i], all of them where days[i] is -1.
+    """
+    ascending_ordinals = ordinals[::-1]
+    return len(ordinals) - np.searchsorted(ascending_ordinals, np.where(days >= 0, days, ascending_ordinals[:1]))
+
+
+def _period_rsi_values(n: int, xs: ndarray, close_mask: ndarray, window_ends: ndarray) -> ndarray:
+    """
+    DEPENDS ON: _decayed_sums(), _rsi_from_averages()
+    USED BY: period_rsi_series()
+
+    result[i] equals calculate_rsi(n, [xs[i]] + the period closes among xs[i+1:window_ends[i]]), NaN if it is None.
+    xs is descending in dates and close_mask marks the period closes.
+
+    the first move xs[i] - (previous period close) is different for every date,
+    the other moves are the moves between period closes, so their Wilder walk of 13n - 1 moves
+    and their seed sums are computed once for the whole resampled series.
+    """
+    length = len(xs)
+    m = 13 * n
+    decay = (n - 1) / n
+    result = np.full(length, np.nan)
+    close_positions = np.flatnonzero(close_mask)
+    firsts = np.searchsorted(close_positions, np.arange(length), side='right')
+    lasts = np.searchsorted(close_positions, window_ends, side='left') - 1
+    valid = lasts - firsts + 2 >= 14 * n + 1
+    if not valid.any():
+        return result
+    else:
+        closes = xs[close_positions]
+        close_diffs = closes[:-1] - closes[1:]
+        k = firsts[valid]
+        last = lasts[valid]
+        first_diffs = xs[valid] - closes[k]
+
+        def average(first_moves, moves):
+            walks = _decayed_sums(decay, m - 1, moves[::-1] / n)[::-1]
+            sums = np.concatenate(([0.0], np.cumsum(moves)))
+            seeds = (sums[last] - sums[k + m - 1]) / n
+            return first_moves / n + decay * walks[k] + decay ** m * seeds
+
+        avg_gains = average(np.maximum(first_diffs, 0.0), np.maximum(close_diffs, 0.0))
+        avg_losses = average(np.maximum(-first_diffs, 0.0), np.maximum(-close_diffs, 0.0))
+        result[valid] = _rsi_from_averages(avg_gains, avg_losses)
+        return result
+
+
+def resample_closes(prices: Any, dates: Any = None, period: str = 'W', calendar: Optional[TradingCalendar] = None) -> PriceSeries:
+    """
+    DEPENDS ON: TradingCalendar, PriceSeries
+    IMPORTS: numpy
+
+    the weekly ('W') or monthly ('M') closes of a daily series, picked with the period-end mask of calendar in one pass.
+    prices and dates are in the same order, prices can also be a PriceSeries, then dates can be left out.
+    Without calendar the dates themselves are the trading calendar.
+    The result keeps the order, so resample_closes(descending prices) can go straight into rsi_series(), steep_series() etc.
+    """
+    xs = _as_array(prices)
+    ordinals = to_ordinals(prices.days if dates is None else dates)
+    calendar = TradingCalendar(ordinals) if calendar is None else calendar
+    mask = calendar.is_period_close(ordinals, period)
+    is_descending = len(ordinals) > 1 and bool(ordinals[0] > ordinals[-1])
+    return PriceSeries(ordinals[mask], xs[mask], is_descending=is_descending)
+
+
+def period_rsi_series(n: int, prices: Any, dates: Any = None, period: str = 'W', window: int = 1000, calendar: Optional[TradingCalendar] = None) -> ndarray:
+    """
+    DEPENDS ON: _counts_since(), _period_rsi_values(), TradingCalendar
+    USED BY: compute_technical_frame()
+
+    get_weekly_rsi() of the price pipeline for every date in one call, NaN where it returns None.
+    For date i, the RSI input is the price of date i followed by the period closes of the earlier dates
+    within window trading days (date i included), the default is the 1000-day window of weekly RSI.
+
+    prices and dates need to be descending in dates, prices can also be a descending PriceSeries, then dates can be left out.
+    """
+    xs = _as_array(prices)
+    ordinals = to_ordinals(prices.days if dates is None else dates)
+    calendar = TradingCalendar(ordinals) if calendar is None else calendar
+    close_mask = calendar.is_period_close(ordinals, period)
+    window_ends = _counts_since(ordinals, calendar.shift(ordinals, 1 - window))
+    return _period_rsi_values(n, xs, close_mask, window_ends)
+
+
+class IndicatorGraph:
+    """
+    DEPENDS ON: _centered_sums(), rolling_means(), ema_series(), steep_series(), deltas(), convert_to_changes(), rolling_quantiles(), _wilder_averages()
+    IMPORTS: numpy, re
+    USED BY: compute_technical_frame()
+
+    A lazy indicator graph over one descending price series (or a symbols x days matrix).
+    Outputs are declared by name and computed on demand, every intermediate node
+    (the cumulative sum, the one-day deltas and their gains and losses, EMA series, change windows)
+    is computed once and kept in memo, so ma50, ema50 and steep50 share one cumulative sum and one EMA series.
+
+    graph = IndicatorGraph(prices)
+    outputs = graph.compute(['ma20', 'ma250', 'steep250', 'rsi14', 'increase20'])
+
+    every output is the series for all dates, the same as the series functions:
+    ma{n} is rolling_means(), ema{n} is ema_series(), steep{n} is steep_series(), rsi{n} is rsi_series(),
+    changes{n} is convert_to_changes(), increase{n} and decrease{n} are the 0.98 and 0.02 quantiles
+    of the changes in windows of 501 prices (1-D prices only).
+    slope{n} and rsquared{n} are rolling_regression(), volatility{n}, sharpe{n} and drawdown{n} are
+    rolling_volatility(), rolling_sharpe() and rolling_max_drawdown(),
+    slope and rsquared share one regression, volatility and sharpe share one set of return moments,
+    periods and rate are the periods and rate arguments of rolling_volatility() and rolling_sharpe().
+    The results are equal to the series functions up to rounding, the graph only keeps one run, build a new one for new prices.
+    """
+    __slots__ = ('xs', 'periods', 'rate', 'memo')
+    OUTPUT_PATTERN = re.compile(r'(ma|ema|steep|rsi|changes|increase|decrease|slope|rsquared|volatility|sharpe|drawdown)(\d+)')
+
+    def __init__(self, prices: Any, periods: int = 252, rate: float = 0.0) -> None:
+        self.xs: ndarray = _as_array(prices)
+        self.periods = periods
+        self.rate = rate
+        self.memo: Dict[tuple, Any] = {}
+
+    def node(self, name: str, *params: int) -> ndarray:
+        """
+        the memoized intermediate or output name(*params), e.g. node('ema', 50) or node('gains').
+        """
+        key = (name,) + params
+        if key not in self.memo:
+            self.memo[key] = getattr(self, f'_{name}')(*params)
+        return self.memo[key]
+
+    def get(self, output: str) -> ndarray:
+        match = self.OUTPUT_PATTERN.fullmatch(output)
+        if match is None:
+            raise ValueError(f'unknown indicator output {output!r}')
+        else:
+            return self.node(match.group(1), int(match.group(2)))
+
+    def compute(self, outputs: List[str]) -> Dict[str, ndarray]:
+        return {output: self.get(output) for output in outputs}
+
+    def _sums(self) -> ndarray:
+        return _centered_sums(self.xs)
+
+    def _ma(self, n: int) -> ndarray:
+        return rolling_means(n, self.xs, sums=self.node('sums'))
+
+    def _ema(self, n: int) -> ndarray:
+        return ema_series(n, self.xs, seeds=self.node('ma', n)[..., 2 * n:])
+
+    def _steep(self, n: int) -> ndarray:
+        return steep_series(n, self.xs, em_series=self.node('ema', n))
+
+    def _diffs(self) -> ndarray:
+        return deltas(1, self.xs, as_list=False)
+
+    def _gains(self) -> ndarray:
+        return np.maximum(self.node('diffs'), 0.0)
+
+    def _losses(self) -> ndarray:
+        return np.maximum(-self.node('diffs'), 0.0)
+
+    def _rsi(self, n: int) -> ndarray:
+        count = self.xs.shape[-1] - 14 * n
+        if count < 1:
+            return np.empty(self.xs.shape[:-1] + (0,))
+        else:
+            avg_gains = _wilder_averages(n, self.node('gains'), count)
+            avg_losses = _wilder_averages(n, self.node('losses'), count)
+            return _rsi_from_averages(avg_gains, avg_losses)
+
+    def _regression(self, n: int) -> Tuple[ndarray, ndarray]:
+        return rolling_regression(n, self.xs)
+
+    def _slope(self, n: int) -> ndarray:
+        return self.node('regression', n)[0]
+
+    def _rsquared(self, n: int) -> ndarray:
+        return self.node('regression', n)[1]
+
+    def _log_moments(self, n: int) -> Tuple[ndarray, ndarray]:
+        return _log_return_moments(n, self.xs)
+
+    def _annualized(self, n: int) -> Tuple[ndarray, ndarray]:
+        return _annualized_moments(*self.node('log_moments', n), self.periods, self.rate)
+
+    def _volatility(self, n: int) -> ndarray:
+        return self.node('annualized', n)[0]
+
+    def _sharpe(self, n: int) -> ndarray:
+        return self.node('annualized', n)[1]
+
+    def _drawdown(self, n: int) -> ndarray:
+        return rolling_max_drawdown(n, self.xs)
+
+    def _changes(self, n: int) -> ndarray:
+        return convert_to_changes(n, self.xs, as_list=False)
+
+    def _change_quantiles(self, n: int, w: int) -> ndarray:
+        """ the 0.98 and 0.02 quantiles of the changes in windows of w prices, one sorted window sweep for both """
+        return rolling_quantiles([0.98, 0.02], w - n, self.node('changes', n))
+
+    def _increase(self, n: int) -> ndarray:
+        return self.node('change_quantiles', n, 501)[0]
+
+    def _decrease(self, n: int) -> ndarray:
+        return self.node('change_quantiles', n, 501)[1]
+
+
+def _target_quantiles(n: int, graph: IndicatorGraph, window_lengths: ndarray) -> ndarray:
+    """
+    DEPENDS ON: IndicatorGraph, convert_to_changes(), quantiles()
+    USED BY: compute_technical_frame()
+
+    result[:, i] is the 0.98 and 0.02 quantiles of convert_to_changes(n, xs[i:i+window_lengths[i]]),
+    NaN where the window has 497 prices or less (the len(td_odict) > 497 rule of the price pipeline).
+    Windows of 501 prices share one rolling sweep, the few other windows are computed one by one.
+    """
+    xs = graph.xs
+    length = len(xs)
+    result = np.full((2, length), np.nan)
+    full = graph.node('change_quantiles', n, 501)
+    is_full = window_lengths[:full.shape[1]] == 501
+    result[:, :full.shape[1]][:, is_full] = full[:, is_full]
+    for i in np.flatnonzero((window_lengths > 497) & np.isnan(result[0])):
+        window_changes = convert_to_changes(n, xs[i:i + window_lengths[i]], as_list=False)
+        result[:, i] = quantiles([0.98, 0.02], window_changes)
+    return result
+
+
+def compute_technical_frame(prices: Any, dates: Any = None, FROM: Optional[date] = None, TO: Optional[date] = None, calendar: Optional[TradingCalendar] = None) -> DataFrame:
+    """
+    DEPENDS ON: IndicatorGraph, period_rsi_series(), check_tops_bottoms(), _target_quantiles()
+    IMPORTS: numpy, pandas, TradingCalendar
+    
+    the technical columns of make_technical_proxy() in pizzapy (ma20 ... fall50) for every date from FROM to TO,
+    computed with vectorized kernels instead of one process pool task per date.
+
+    prices and dates need to be descending in dates, the same as get_price_odict(ascending=False).
+    prices can also be a descending PriceSeries, then dates can be left out.
+    Like make_odict(), include 1000 trading days before FROM and 51 trading days after TO,
+    so that weekly_rsi, the target prices and is_top / is_bottom have their full windows.
+
+    calendar does the add_trading_days() and is_weekly_close() work for all dates at once,
+    without it the dates themselves are the trading calendar.
+    The values are not rounded, None in the proxy is NaN (or <NA> for is_top and is_bottom).
+    """
+    xs = _as_array(prices)
+    ordinals = to_ordinals(prices.days if dates is None else dates)
+    calendar = TradingCalendar(ordinals) if calendar is None else calendar
+    length = len(xs)
+    ascending_ordinals = ordinals[::-1]
+
+    def lookup(days: ndarray) -> ndarray:
+        """ the vectorized odict.get(day), NaN for missing days """
+        positions = np.searchsorted(ascending_ordinals, days)
+        found = (days >= 0) & (positions < length)
+        found[found] = ascending_ordinals[positions[found]] == days[found]
+        return np.where(found, xs[length - 1 - np.minimum(positions, length - 1)], np.nan)
+
+    columns: Dict[str, Any] = {}
+    price = xs.copy()
+
+    graph = IndicatorGraph(xs)
+    for n in (20, 50, 250):
+        columns[f'ma{n}'] = _pad(graph.get(f'ma{n}'), length)
+    for n in (20, 50, 250):
+        columns[f'steep{n}'] = _pad(graph.get(f'steep{n}'), length)
+    for n in (50, 250):
+        ma = columns[f'ma{n}']
+        columns[f'ma{n}_distance'] = np.where(_truthy(price) & _truthy(ma), (price - ma) / ma, np.nan)
+
+    columns['rsi'] = _pad(graph.get('rsi14'), length)
+    columns['weekly_rsi'] = period_rsi_series(14, xs, ordinals, 'W', 1000, calendar)
+
+    positions = np.arange(length)
+    later_ends = calendar.shift(ordinals, 51)
+    firsts = np.maximum(np.where(later_ends >= 0, _counts_since(ordinals, later_ends), 0), positions - 50)
+    is_top, is_bottom = check_tops_bottoms(xs)
+    for i in np.flatnonzero(firsts != np.maximum(positions - 50, 0)):
+        later = xs[firsts[i]:i]
+        enough = len(later) > 48 and bool(_truthy(price[i:i + 1])[0])
+        is_top[i] = float(all(price[i] > later)) if enough else np.nan
+        is_bottom[i] = float(all(price[i] < later)) if enough else np.nan
+    columns['is_top'] = pandas.array(is_top, dtype='Int64')
+    columns['is_bottom'] = pandas.array(is_bottom, dtype='Int64')
+
+    columns['price'] = price
+    for name, n in (('p20', 20), ('p50', 50), ('p100', 100), ('p200', 250), ('p500', 500)):
+        columns[name] = lookup(calendar.shift(ordinals, -n))
+    for n in (20, 50):
+        missing = np.isnan(columns[f'p{n}'])
+        columns[f'p{n}'][missing] = lookup(calendar.shift(ordinals[missing], -n - 1))
+
+    window_lengths = _counts_since(ordinals, calendar.shift(ordinals, -500)) - positions
+    for n in (20, 50):
+        increase, decrease = _target_quantiles(n, graph, window_lengths)
+        old_price = columns[f'p{n}']
+        best = np.where(_truthy(old_price) & _truthy(increase), old_price * (1.0 + increase), np.nan)
+        worst = np.where(_truthy(old_price) & _truthy(decrease), old_price * (1.0 + decrease), np.nan)
+        columns[f'increase{n}'] = increase
+        columns[f'decrease{n}'] = decrease
+        columns[f'best{n}'] = best
+        columns[f'worst{n}'] = worst
+        columns[f'gain{n}'] = np.where(_truthy(price) & _truthy(best), (best - price) / price, np.nan)
+        columns[f'fall{n}'] = np.where(_truthy(price) & _truthy(worst), (price - worst) / price, np.nan)
+
+    start = -np.inf if FROM is None else FROM.toordinal()
+    end = np.inf if TO is None else TO.toordinal()
+    in_range = (ordinals >= start) & (ordinals <= end)
+    index = pandas.Index(to_dates(ordinals[in_range]), name='td')
+    return DataFrame({column: columns[column][in_range] for column in TECHNICAL_COLUMNS}, index=index)
+
+
 
 
 
@@ -193,4 +1362,4 @@ if __name__ == '__main__':
     listbbb = [22.17, 22.4, 23.1, 22.68, 23.33, 23.1, 23.19, 23.65, 23.87, 23.82
                   , 23.63, 23.95, 23.83, 23.75, 24.05, 23.36, 22.61, 22.38, 22.39, 22.15
                   , 22.29, 22.24, 22.43, 22.23, 22.13, 22.18, 22.17, 22.08, 22.19, 22.27]
-    print(rsi_calc(14, listbbb*100))
+    print(calculate_rsi(14, listbbb*100))